@@ -0,0 +1,439 @@
+"""Headless benchmarks for main.py and pages/00_applepie.py (Streamlit AppTest, synthetic data).
+
+    python bench/app_bench.py                               # all scenarios, print a table
+    python bench/app_bench.py --save bench/results.json     # ... and save them
+    python bench/app_bench.py --baseline bench/results.json # fail (exit 1) on regressions
+    python bench/app_bench.py --scenarios scrape mbti-snapshot recipes-1k --reruns 20
+    python bench/app_bench.py --scenarios imports mbti-demo --root ../old-checkout  # before/after
+
+Each scenario runs in a fresh Python process, so cold start includes imports and peak memory
+(max RSS) belongs to that scenario alone:
+
+    imports         time main.py's top-level imports (after streamlit + pandas, which every
+                    page pays) and list which heavy packages they load
+    scrape          crawl a local HTTP stub serving 250 synthetic country pages (fixture HTML
+                    with per-country distributions) and publish a snapshot
+    mbti-demo       main.py with the bundled demo data
+    mbti-snapshot   main.py showing the 250-country snapshot published by `scrape`
+    recipes-<n>     pages/00_applepie.py over a store of n synthetic recipes (1k / 10k / 100k)
+
+Reported per scenario: cold_start_s (process start until the scenario's first full render),
+rerun_ms p50 / p95 (plain reruns) and per-interaction latencies, peak_rss_mb, and for
+`scrape` pages_per_s. The mbti scenarios also report time to first paint of the first run:
+first_element_ms (the script sends its first element) and first_chart_ms (the map).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+STARTED = time.perf_counter()
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+FIXTURES = ROOT / 'bench' / 'fixtures'
+N_COUNTRIES = 250
+RECIPE_SIZES = {'recipes-1k': 1_000, 'recipes-10k': 10_000, 'recipes-100k': 100_000}
+SCENARIOS = ['imports', 'scrape', 'mbti-demo', 'mbti-snapshot'] + list(RECIPE_SIZES)
+DEFAULT_SCENARIOS = ['imports', 'scrape', 'mbti-demo', 'mbti-snapshot', 'recipes-1k', 'recipes-10k']
+# packages main.py should only load on the paths that need them
+HEAVY_MODULES = ['plotly.express', 'pycountry', 'requests', 'bs4', 'lxml']
+
+# metrics where higher is better; everything else numeric is a cost (time, memory)
+HIGHER_IS_BETTER = {'pages_per_s'}
+# ignore regressions smaller than this, whatever the ratio (timer noise on tiny values)
+# (an exact metric name wins over the suffixes: 'pages_per_s' also ends in '_s')
+ABS_FLOOR = {'pages_per_s': 5.0, '_s': 0.05, '_ms': 5.0, '_mb': 10.0}
+
+
+# ------------------------------
+# synthetic data
+# ------------------------------
+
+def country_slugs(n=N_COUNTRIES):
+    """n country URL slugs, mostly real country names so the resolver can map them."""
+    import pycountry
+    names = sorted(getattr(c, 'common_name', c.name) for c in pycountry.countries)
+    names = [n for n in names if re.fullmatch(r"[A-Za-z ]+", n)]
+    slugs = [n.lower().replace(' ', '-') for n in names][:n]
+    slugs += [f'atlantis-{i}' for i in range(n - len(slugs))]
+    return slugs
+
+
+def synthetic_site(n=N_COUNTRIES, seed=0):
+    """{path: html} for the world page and n country pages (the fixture page with random shares)."""
+    from mbti.scraper import WORLD_PATH
+
+    rng = random.Random(seed)
+    template = (FIXTURES / 'country-japan.html').read_text(encoding='utf-8')
+    slugs = country_slugs(n)
+    links = ''.join(f'<li><a href="/country-profiles/{s}">{s}</a></li>' for s in slugs)
+    pages = {WORLD_PATH: f'<html><body><h1>World</h1><ul>{links}</ul></body></html>'}
+    for slug in slugs:
+        weights = [rng.random() for _ in range(16)]
+        shares = iter(round(100 * w / sum(weights), 1) for w in weights)
+        html = re.sub(r'<span class="pct">[0-9.]+%</span>', lambda m: f'<span class="pct">{next(shares)}%</span>', template)
+        pages[f'/country-profiles/{slug}'] = html.replace('<h1>Japan</h1>', f'<h1>{slug}</h1>')
+    return pages
+
+
+def synthetic_recipes(n, seed=0):
+    """n distinct recipes built from the seed recipes' vocabulary."""
+    from recipes.schema import COSTS
+    from recipes.seed import RECIPES
+
+    rng = random.Random(seed)
+    ingredients = sorted({pair for r in RECIPES for pair in r['ingredients']})
+    steps = [s for r in RECIPES for s in r['steps']]
+    cuisines = sorted({r['cuisine'] for r in RECIPES}) + ['일식', '기타']
+    for i in range(n):
+        base = RECIPES[i % len(RECIPES)]
+        yield {
+            'name': f"{base['name']} {i}",
+            'cuisine': rng.choice(cuisines),
+            'time_min': rng.randrange(5, 61, 5),
+            'cost': rng.choice(COSTS),
+            'ingredients': rng.sample(ingredients, rng.randint(4, 9)),
+            'steps': rng.sample(steps, rng.randint(3, 7)),
+        }
+
+
+@contextmanager
+def stub_server(pages, faults=None, log=None):
+    """Serve `pages` ({path: html}) on 127.0.0.1 in a background thread; yields the base URL.
+
+    Responses carry an ETag and honour If-None-Match (304). `faults` ({path: [status, ...]}) makes
+    the next requests for a path fail with those statuses, one per request (an entry may also be
+    a (status, {header: value}) pair); `log` collects (path, status) for every answer. Both may
+    be changed while the server runs.
+    """
+    import hashlib
+
+    encoded = {path: html.encode('utf-8') for path, html in pages.items()}
+    etags = {path: '"%s"' % hashlib.sha1(body).hexdigest()[:16] for path, body in encoded.items()}
+    faults = faults if faults is not None else {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            body, etag = encoded.get(self.path), etags.get(self.path)
+            headers = {}
+            pending = faults.get(self.path)
+            if pending:
+                status, body, etag = pending.pop(0), b'unavailable', None
+                if isinstance(status, tuple):
+                    status, headers = status
+            elif body is None:
+                status, body = 404, b'not found'
+            elif self.headers.get('If-None-Match') == etag:
+                status, body = 304, b''
+            else:
+                status = 200
+            if log is not None:
+                log.append((self.path, status))
+            self.send_response(status)
+            if etag:
+                self.send_header('ETag', etag)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ------------------------------
+# measurements (run inside the per-scenario child process)
+# ------------------------------
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == 'darwin' else rss / 1024  # bytes on macOS, KiB on Linux
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def summarize(prefix, samples):
+    ms = sorted(1000 * s for s in samples)
+    return {f'{prefix}_p50_ms': round(statistics.median(ms), 2),
+            f'{prefix}_p95_ms': round(ms[min(len(ms) - 1, int(0.95 * len(ms)))], 2)}
+
+
+def check(at):
+    if at.exception:
+        raise RuntimeError(f'app raised: {at.exception[0].message}')
+    return at
+
+
+def widget(elements, label):
+    return next(e for e in elements if e.label == label)
+
+
+def heavy_loaded():
+    return [m for m in HEAVY_MODULES if m in sys.modules]
+
+
+def run_imports(args):
+    import ast
+
+    t0 = time.perf_counter()
+    import pandas  # noqa: F401
+    import streamlit  # noqa: F401
+    base = time.perf_counter() - t0
+
+    # main.py's module-level import statements, without running the rest of the script
+    tree = ast.parse((ROOT / 'main.py').read_text(encoding='utf-8'))
+    imports = ast.Module([node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))], [])
+    code = compile(imports, 'main.py', 'exec')
+    t0 = time.perf_counter()
+    exec(code, {'__name__': 'main_imports'})
+    return {'streamlit_import_s': round(base, 3), 'app_import_s': round(time.perf_counter() - t0, 3),
+            'heavy_modules': heavy_loaded()}
+
+
+def run_scrape(args):
+    from mbti import snapshots
+    from mbti.crawler import Crawler
+    from mbti.httpcache import HttpCache
+    from mbti.scraper import scrape_16personalities_world
+    from mbti.state import CountryState
+
+    cache_dir = Path(os.environ['MBTI_CACHE_DIR'])
+    with stub_server(synthetic_site(N_COUNTRIES)) as base:
+        result = {'countries': N_COUNTRIES}
+        for label in ('cold', 'cached'):
+            with Crawler(max_workers=8, per_host_rate=args.rate, cache=HttpCache(cache_dir / 'http.sqlite')) as crawler:
+                state = CountryState(cache_dir / 'countries.sqlite')
+                t0 = time.perf_counter()
+                df = scrape_16personalities_world(base, crawler=crawler, state=state, force=True)
+                seconds = time.perf_counter() - t0
+                state.close()
+            result[f'{label}_scrape_s'] = round(seconds, 3)
+            if label == 'cold':
+                result['pages_per_s'] = round((N_COUNTRIES + 1) / seconds, 1)
+                result['scraped_countries'] = len(df)
+    result['snapshot'] = snapshots.publish(df)
+    return result
+
+
+@contextmanager
+def paint_probe():
+    """Collect the ms from entry until the script sends its first element and its first chart.
+
+    A real server forwards every element to the browser as soon as the script emits it, so
+    these are what a user waits for before the page, and then the map, starts to show.
+    """
+    from streamlit.delta_generator import DeltaGenerator
+
+    seen = {}
+    original = DeltaGenerator._enqueue
+    t0 = time.perf_counter()
+
+    def _enqueue(self, delta_type, *args, **kwargs):
+        elapsed = round(1000 * (time.perf_counter() - t0), 1)
+        seen.setdefault('first_element_ms', elapsed)
+        if delta_type == 'plotly_chart':
+            seen.setdefault('first_chart_ms', elapsed)
+        return original(self, delta_type, *args, **kwargs)
+
+    DeltaGenerator._enqueue = _enqueue
+    try:
+        yield seen
+    finally:
+        DeltaGenerator._enqueue = original
+
+
+def run_mbti(args, snapshot):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / 'main.py'), default_timeout=args.timeout)
+    with paint_probe() as paint:
+        check(at.run())
+    if snapshot:
+        check(widget(at.sidebar.selectbox, 'Choose data source').select('Try scrape 16Personalities (best-effort)').run())
+        if not any('snapshot' in str(s.value) for s in at.success):
+            raise RuntimeError('main.py did not pick up the benchmark snapshot')
+    result = {'cold_start_s': round(time.perf_counter() - STARTED, 3), **paint,
+              'countries': len(at.dataframe[0].value), 'heavy_modules': heavy_loaded()}
+    result.update(summarize('rerun', timed(lambda: check(at.run()), args.reruns)))
+    if len(at.sidebar.selectbox) > 1:
+        from mbti.figures import METRICS
+
+        color = widget(at.sidebar.selectbox, 'Color countries by')
+        options = [m for m, label in METRICS.items() if label in color.options]
+
+        def recolor():
+            color.set_value(options[(options.index(color.value) + 1) % len(options)])
+            check(at.run())
+        result.update(summarize('recolor', timed(recolor, min(args.reruns, 2 * len(options)))))
+    return result
+
+
+def run_recipes(args, n):
+    from recipes.store import RecipeStore
+    from streamlit.testing.v1 import AppTest
+
+    # filling the store is setup, not app start-up: leave it out of cold_start_s
+    t0 = time.perf_counter()
+    store = RecipeStore(seed=False)
+    store.add_many(synthetic_recipes(n))
+    store.close()
+    setup = time.perf_counter() - t0
+
+    started = time.perf_counter()
+    at = AppTest.from_file(str(ROOT / 'pages' / '00_applepie.py'), default_timeout=args.timeout)
+    check(at.run())
+    result = {'recipes': n, 'cold_start_s': round(time.perf_counter() - STARTED - setup, 3),
+              'first_render_s': round(time.perf_counter() - started, 3)}
+    result.update(summarize('rerun', timed(lambda: check(at.run()), args.reruns)))
+
+    queries = iter(['된장', '김치 찌개', '두부', '파스타', '볶음'] * args.reruns)
+    result.update(summarize('search', timed(lambda: check(at.text_input[0].input(next(queries)).run()), args.reruns)))
+    check(at.text_input[0].input('').run())
+
+    pages = iter(range(2, 2 + args.reruns))
+    result.update(summarize('next_page', timed(lambda: check(at.number_input[0].set_value(next(pages)).run()), args.reruns)))
+    return result
+
+
+def run_scenario(name, args):
+    if name == 'imports':
+        result = run_imports(args)
+    elif name == 'scrape':
+        result = run_scrape(args)
+    elif name == 'mbti-demo':
+        result = run_mbti(args, snapshot=False)
+    elif name == 'mbti-snapshot':
+        result = run_mbti(args, snapshot=True)
+    else:
+        result = run_recipes(args, RECIPE_SIZES[name])
+    result['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return result
+
+
+# ------------------------------
+# orchestration
+# ------------------------------
+
+def set_root(root):
+    global ROOT
+    ROOT = Path(root).resolve()
+    sys.path.insert(0, str(ROOT))
+
+
+def run_all(scenarios, args):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='app-bench-') as tmp:
+        env = dict(os.environ,
+                   MBTI_CACHE_DIR=str(Path(tmp) / 'mbti'),  # HTTP cache, country state and snapshots
+                   MBTI_EXTERNAL_WORKER='1',                # never start the real background scraper
+                   PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get('PYTHONPATH')])))
+        env.pop('MBTI_DATA_PATH', None)
+        if 'mbti-snapshot' in scenarios and 'scrape' not in scenarios:
+            scenarios = ['scrape'] + list(scenarios)
+        for name in scenarios:
+            env['RECIPE_DB'] = str(Path(tmp) / f'{name}.sqlite')
+            cmd = [sys.executable, __file__, '--child', name, '--reruns', str(args.reruns),
+                   '--rate', str(args.rate), '--timeout', str(args.timeout), '--root', str(ROOT)]
+            proc = subprocess.run(cmd, env=env, cwd=ROOT, capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise SystemExit(f'scenario {name} failed:\n{proc.stderr}')
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f'{name:>14}: {results[name]}', file=sys.stderr)
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'reruns': args.reruns,
+            'scenarios': results}
+
+
+def compare(current, baseline, tolerance):
+    """Rows of (scenario, metric, baseline, current, change) and whether any is a regression."""
+    rows, failed = [], False
+    for name, metrics in current['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name, {})
+        for metric, value in metrics.items():
+            before = old.get(metric)
+            floor = ABS_FLOOR.get(metric)
+            if floor is None:
+                floor = next((f for suffix, f in ABS_FLOOR.items() if metric.endswith(suffix)), None)
+            # only measurements are compared, not descriptive counts (countries, recipes, ...)
+            if floor is None or not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or not before:
+                continue
+            change = (value - before) / before
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            regressed = worse > tolerance and abs(value - before) > floor
+            failed |= regressed
+            rows.append((name, metric, before, value, change, regressed))
+    return rows, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=DEFAULT_SCENARIOS)
+    parser.add_argument('--reruns', type=int, default=10, help='timed reruns / interactions per scenario')
+    parser.add_argument('--rate', type=float, default=0, help='crawler per-host rate limit for `scrape` (0 = off)')
+    parser.add_argument('--timeout', type=float, default=600, help='AppTest timeout per run, seconds')
+    parser.add_argument('--save', help='write results as JSON')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown vs baseline (0.25 = 25%%)')
+    parser.add_argument('--root', type=Path, default=ROOT, help='app checkout to benchmark (default: this one)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    set_root(args.root)
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, args)))
+        return
+
+    current = run_all(args.scenarios, args)
+    for name, metrics in current['scenarios'].items():
+        print(f'\n{name}')
+        for metric, value in metrics.items():
+            print(f'  {metric:>20}: {value}')
+    if args.save:
+        Path(args.save).write_text(json.dumps(current, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        rows, failed = compare(current, baseline, args.tolerance)
+        print(f'\nvs {args.baseline} (tolerance {args.tolerance:.0%})')
+        for name, metric, before, value, change, regressed in rows:
+            flag = '  REGRESSION' if regressed else ''
+            print(f'  {name:>14} {metric:>20}: {before} -> {value} ({change:+.0%}){flag}')
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Crawler cache/retry paths against a local HTTP stub: 304 revalidation, 5xx retries, stale fallback,
+and how the scraper records a stale copy in the per-country state.
+
+    python bench/crawler_checks.py
+
+Each check runs against a fresh stub server and response cache, prints ok/FAIL, and the script
+exits 1 if any check failed.
+"""
+
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'bench'))
+
+from app_bench import stub_server, synthetic_site  # noqa: E402
+from mbti.crawler import Crawler  # noqa: E402
+from mbti.httpcache import HttpCache  # noqa: E402
+from mbti.scraper import WORLD_PATH, scrape_16personalities_world  # noqa: E402
+from mbti.state import CountryState  # noqa: E402
+
+PAGE = '/country-profiles/japan'
+PAGES = {PAGE: '<html><body><h1>Japan</h1></body></html>'}
+
+
+def crawler(tmp, ttl=0, retries=2):
+    # ttl=0: every cached entry is stale at once, so each fetch goes to the server
+    return Crawler(max_workers=2, per_host_rate=0, retries=retries, backoff=0.01, timeout=2,
+                   cache=HttpCache(Path(tmp) / 'http.sqlite', ttl=ttl))
+
+
+def check_revalidation(tmp):
+    log = []
+    with stub_server(PAGES, log=log) as base, crawler(tmp) as c:
+        first, second = c.fetch(base + PAGE), c.fetch(base + PAGE)
+    assert [status for _, status in log] == [200, 304], log
+    assert (first.status, first.from_cache) == (200, False), first
+    assert (second.status, second.text, second.from_cache) == (200, PAGES[PAGE], True), second
+
+
+def check_retry(tmp):
+    log = []
+    with stub_server(PAGES, faults={PAGE: [503, 429]}, log=log) as base, crawler(tmp) as c:
+        page = c.fetch(base + PAGE)
+    assert [status for _, status in log] == [503, 429, 200], log
+    assert (page.status, page.text) == (200, PAGES[PAGE]), page
+
+
+def check_retries_exhausted(tmp):
+    # nothing cached: the final 5xx is returned as is
+    with stub_server(PAGES, faults={PAGE: [503] * 3}) as base, crawler(tmp) as c:
+        page = c.fetch(base + PAGE)
+    assert page.status == 503 and not page.from_cache, page
+
+
+def check_stale_on_5xx(tmp):
+    faults, log = {}, []
+    with stub_server(PAGES, faults=faults, log=log) as base, crawler(tmp) as c:
+        c.fetch(base + PAGE)
+        faults[PAGE] = [503] * 3
+        page = c.fetch(base + PAGE)
+    assert [status for _, status in log] == [200, 503, 503, 503], log
+    assert (page.text, page.from_cache, page.stale, page.status) == (PAGES[PAGE], True, True, 503), page
+
+
+def check_long_retry_after_is_not_waited(tmp):
+    faults, log = {}, []
+    with stub_server(PAGES, faults=faults, log=log) as base, crawler(tmp) as c:
+        c.fetch(base + PAGE)
+        faults[PAGE] = [(503, {'Retry-After': '86400'})]
+        t0 = time.perf_counter()
+        page = c.fetch(base + PAGE)
+        elapsed = time.perf_counter() - t0
+    assert elapsed < 5, elapsed
+    assert [status for _, status in log] == [200, 503], log
+    assert (page.text, page.stale, page.status) == (PAGES[PAGE], True, 503), page
+
+
+def check_stale_on_network_error(tmp):
+    with stub_server(PAGES) as base, crawler(tmp, retries=1) as c:
+        c.fetch(base + PAGE)
+    # server is shut down now
+    with crawler(tmp, retries=1) as c:
+        page = c.fetch(base + PAGE)
+    assert (page.text, page.from_cache, page.stale, page.status) == (PAGES[PAGE], True, True, None), page
+    assert page.error is not None, page
+
+
+def check_stale_scrape_is_a_failure(tmp):
+    site = synthetic_site(2)
+    state = CountryState(Path(tmp) / 'countries.sqlite')
+    with stub_server(site) as base, crawler(tmp, retries=0) as c:
+        scrape_16personalities_world(base, crawler=c, state=state)
+        first = state.frame()
+    # upstream is gone: the refresh keeps the stored values but must not count as a fetch
+    with crawler(tmp, retries=0) as c:
+        df = scrape_16personalities_world(base, crawler=c, state=state, force=True)
+    urls = [base + path for path in site if path != WORLD_PATH]
+    assert len(df) == len(first) == 2, df
+    assert (df['fetched_at'] == first['fetched_at']).all(), (first['fetched_at'], df['fetched_at'])
+    assert sorted(state.failures()['url']) == sorted(urls), state.failures()
+    assert sorted(state.stale_urls(urls)) == sorted(urls)
+    state.close()
+
+
+CHECKS = [check_revalidation, check_retry, check_retries_exhausted, check_stale_on_5xx,
+          check_long_retry_after_is_not_waited, check_stale_on_network_error, check_stale_scrape_is_a_failure]
+
+
+def main():
+    failed = 0
+    for check in CHECKS:
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                check(tmp)
+            except Exception:
+                failed += 1
+                print(f'FAIL  {check.__name__}')
+                traceback.print_exc()
+            else:
+                print(f'ok    {check.__name__}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Per-page parse time: legacy BeautifulSoup/regex parser vs mbti.parse, on HTML fixtures.
+
+    python bench/parse_bench.py [--repeat 50]
+
+The fixtures in bench/fixtures are synthetic pages, not saved copies of 16Personalities. They
+are written around the container classes mbti.parse looks for first (`personality-type`,
+`country-profile`, `id="types"`), and real pages may not use them. So each fixture is also
+timed with those markers stripped. That variant exercises the visible-body-text fallback, the
+path a page with unknown markup takes.
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from mbti.parse import parse_distribution, top_type  # noqa: E402
+
+FIXTURES = ROOT / 'bench' / 'fixtures'
+
+# the result-container markers of mbti.parse._RESULT_TEXT
+_MARKERS = re.compile(r'\s(?:class="[^"]*\b(?:personality-type|type-distribution|country-profile)\b[^"]*"|id="types")')
+
+
+def without_result_markers(html):
+    """`html` with the container classes / ids removed, so mbti.parse falls back to body text."""
+    return _MARKERS.sub('', html)
+
+
+def legacy_parse(html):
+    """The parser main.py used before mbti.parse, kept verbatim as the baseline."""
+    s = BeautifulSoup(html, 'html.parser')
+    text = s.get_text(separator=' ')
+    import re
+    m = re.search(r'([A-Z]{4})[^%\n]{0,40}([0-9]{1,2}\.[0-9]|[0-9]{1,2})%', text)
+    if m:
+        return m.group(1), float(m.group(2))
+    types = ['ISTJ','ISFJ','INFJ','INTJ','ISTP','ISFP','INFP','INTP','ESTP','ESFP','ENFP','ENTP','ESTJ','ESFJ','ENFJ','ENTJ']
+    found_type = None
+    for tt in types:
+        if tt in text:
+            found_type = tt
+            break
+    if not found_type:
+        return None
+    idx = text.find(found_type)
+    nearby = text[max(0, idx-80): idx+80]
+    m2 = re.search(r'([0-9]{1,2}\.[0-9]|[0-9]{1,2})%', nearby)
+    return found_type, float(m2.group(1)) if m2 else None
+
+
+def new_parse(html):
+    return top_type(parse_distribution(html))
+
+
+def time_per_page(fn, pages, repeat):
+    samples = []
+    for _ in range(repeat):
+        for html in pages:
+            t0 = time.perf_counter()
+            fn(html)
+            samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def run(repeat=50):
+    pages = [p.read_text(encoding='utf-8') for p in sorted(FIXTURES.glob('country-*.html'))]
+    fallback_pages = [without_result_markers(html) for html in pages]
+    if any(_MARKERS.search(html) for html in fallback_pages):
+        raise RuntimeError('result markers left in the fallback pages')
+    if [parse_distribution(html) for html in fallback_pages] != [parse_distribution(html) for html in pages]:
+        raise RuntimeError('the body-text fallback parses the fixtures differently')
+    legacy_ms = time_per_page(legacy_parse, pages, repeat)
+    new_ms = time_per_page(new_parse, pages, repeat)
+    fallback_ms = time_per_page(new_parse, fallback_pages, repeat)
+    return {
+        'pages': len(pages),
+        'legacy_ms_per_page': round(legacy_ms, 3),
+        'new_ms_per_page': round(new_ms, 3),
+        'speedup': round(legacy_ms / new_ms, 2),
+        'fallback_ms_per_page': round(fallback_ms, 3),
+        'fallback_speedup': round(legacy_ms / fallback_ms, 2),
+        'types_found_per_page': [len(parse_distribution(html)) for html in pages],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args(argv)
+    for key, value in run(args.repeat).items():
+        print(f'{key:>22}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
 """
 Streamlit app: MBTI Most-Common Type by Country (demo + scraper fallback)
 - Shows a world choropleth where each country is colored by its most-common MBTI type (categorical)
-- Requires a CSV `mbti_by_country.csv` with columns: country, iso_alpha3, top_type, percentage
+- Reads a dataset with columns country, top_type, percentage (iso_alpha3 optional) from a CSV / Parquet / JSON file
+  or a directory of shards (sidebar path, default `mbti_by_country.csv`, or env MBTI_DATA_PATH)
 
 Notes:
 - 16Personalities provides country profiles based on >40M respondents (use for scraping if desired). See: https://16personalities.com (included in README).
@@ -15,12 +16,17 @@ To run locally:
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import pycountry
-import requests
-from bs4 import BeautifulSoup
-from functools import lru_cache
 import io
+import os
+import time
+
+# heavy third-party packages are imported where they are used: plotly when the first figure is
+# built, pycountry when the country index is built, requests / lxml only on the scrape path
+from mbti import loaders, metrics, snapshots, warmup
+from mbti.countries import get_resolver
+from mbti.figures import METRICS, build_choropleth, dataset_version, freeze
+
+rerun_started = time.perf_counter()
 
 st.set_page_config(layout="wide", page_title="MBTI by Country — Map")
 
@@ -37,27 +43,20 @@ This demo shows, for each country, which MBTI type is most common and its percen
 # Utility functions
 # ------------------------------
 
-def country_to_iso3(name):
-    try:
-        country = pycountry.countries.lookup(name)
-        return country.alpha_3
-    except Exception:
-        # manual overrides for common mismatches
-        overrides = {
-            'United States': 'USA',
-            'South Korea': 'KOR',
-            'North Korea': 'PRK',
-            'Russia': 'RUS',
-            'Czech Republic': 'CZE',
-            'Iran': 'IRN',
-            'Syria': 'SYR',
-            'Venezuela': 'VEN',
-            'Bolivia': 'BOL',
-            'Vietnam': 'VNM',
-            'Tanzania': 'TZA',
-            'Laos': 'LAO',
-        }
-        return overrides.get(name)
+@st.cache_resource(show_spinner=False)
+def warm_up():
+    # once per server, in a background thread: Plotly Express + template and the pycountry
+    # index, so the first session after a restart paints before they are loaded
+    return warmup.start()
+
+
+warm_up()
+
+
+@st.cache_resource(show_spinner=False)
+def country_resolver():
+    # build the country-name index once per server, not on the first lookup of a request
+    return get_resolver().warm_up()
 
 
 @st.cache_data(show_spinner=False)
@@ -81,76 +80,49 @@ France,FRA,ISFJ,9.8
     return pd.read_csv(csv)
 
 
-# Best-effort scraper for 16personalities country pages (may not work if site requires JS)
-@lru_cache(maxsize=1)
-def scrape_16personalities_world():
-    """Try to gather country -> top MBTI + percentage from 16personalities country profiles.
-    Returns a DataFrame or raises an exception if scraping clearly failed.
-    """
-    base = 'https://www.16personalities.com'
-    world_url = base + '/country-profiles/global/world'
-    headers = { 'User-Agent': 'mbti-country-map-bot/1.0 (demo)' }
-    resp = requests.get(world_url, headers=headers, timeout=15)
-    if resp.status_code != 200:
-        raise RuntimeError(f"Failed to fetch world page: {resp.status_code}")
-
-    soup = BeautifulSoup(resp.text, 'html.parser')
-    # Attempt: find links to country profiles
-    links = []
-    for a in soup.select('a'):
-        href = a.get('href', '')
-        if href.startswith('/country-profiles/') and href.count('/') >= 2:
-            full = base + href
-            if full not in links:
-                links.append(full)
-
-    results = []
-    for url in links:
-        try:
-            r = requests.get(url, headers=headers, timeout=10)
-            if r.status_code != 200:
-                continue
-            s = BeautifulSoup(r.text, 'html.parser')
-            # heuristic: look for 'Top personality types' area — try to find percentage numbers in page text
-            text = s.get_text(separator=' ')
-            # naive extraction: find occurrences like 'ISTJ' near a '%' sign
-            import re
-            m = re.search(r'([A-Z]{4})[^%\n]{0,40}([0-9]{1,2}\.[0-9]|[0-9]{1,2})%', text)
-            if m:
-                ttype = m.group(1)
-                perc = float(m.group(2))
-            else:
-                # fallback: pick first type word from a known list and try to find percentage
-                types = ['ISTJ','ISFJ','INFJ','INTJ','ISTP','ISFP','INFP','INTP','ESTP','ESFP','ENFP','ENTP','ESTJ','ESFJ','ENFJ','ENTJ']
-                found_type = None
-                for tt in types:
-                    if tt in text:
-                        found_type = tt
-                        break
-                if not found_type:
-                    continue
-                # find nearest percentage
-                idx = text.find(found_type)
-                nearby = text[max(0, idx-80): idx+80]
-                m2 = re.search(r'([0-9]{1,2}\.[0-9]|[0-9]{1,2})%', nearby)
-                if m2:
-                    perc = float(m2.group(1))
-                else:
-                    perc = None
-                ttype = found_type
-
-            # guess country name from URL
-            country_slug = url.rstrip('/').split('/')[-1].replace('-', ' ').title()
-            iso = country_to_iso3(country_slug)
-            results.append({'country': country_slug, 'iso_alpha3': iso, 'top_type': ttype, 'percentage': perc})
-        except Exception:
-            continue
-
-    if not results:
-        raise RuntimeError('No results scraped — site may be JS-driven or blocking requests')
-
-    df = pd.DataFrame(results)
-    return df
+# Scraped data is built off the request path: a BackgroundRefresher thread (or a separate
+# `python -m mbti.worker` process, see MBTI_EXTERNAL_WORKER) scrapes 16Personalities on a
+# schedule and publishes versioned snapshots. The page only ever loads the latest one.
+@st.cache_resource(show_spinner=False)
+def get_refresher():
+    from mbti.worker import BackgroundRefresher  # the scraping stack (requests, lxml)
+    return BackgroundRefresher().start()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_snapshot(version):
+    # memory-mapped MbtiDataset, shared read-only by all sessions
+    return snapshots.load(version)
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def snapshot_frame(version):
+    snapshot_cache.miss()
+    ds = load_snapshot(version)
+    # axis shares only mean something when pages gave more than the top type
+    return ds.to_frame(axis_shares=bool(len(ds)) and ds.known_types().max() > 1)
+
+
+# Figures are cached serialized per (dataset version, display options) and shared by all
+# sessions, so a rerun that shows the same data skips px.choropleth and the JSON conversion.
+@st.cache_resource(show_spinner=False, max_entries=16)
+def choropleth_figure(version, local_geojson, color, _df_display):
+    figure_cache.miss()
+    return freeze(build_choropleth(_df_display, local_geojson=local_geojson, color=color))
+
+
+# External datasets are cached by content fingerprint: reruns (and file touches that don't
+# change the bytes) reuse the parsed frame; editing the file invalidates it.
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_external_data(path, content_hash):
+    external_cache.miss()
+    return loaders.read_dataset(path)
+
+
+# hit/miss accounting for the st.cache_* functions above (see mbti.metrics.CacheProbe)
+snapshot_cache = metrics.CacheProbe('snapshot_frame')
+figure_cache = metrics.CacheProbe('figure')
+external_cache = metrics.CacheProbe('external_dataset')
 
 
 # ------------------------------
@@ -158,41 +130,66 @@ def scrape_16personalities_world():
 # ------------------------------
 
 st.sidebar.header('Data')
-data_option = st.sidebar.selectbox('Choose data source', ['Demo sample CSV (recommended for quick start)', 'Try scrape 16Personalities (best-effort)'])
+data_options = ['Demo sample CSV (recommended for quick start)', 'Try scrape 16Personalities (best-effort)', 'Local file (CSV / Parquet / JSON or a directory of them)']
+# MBTI_DATA_PATH preselects the local-file source
+data_path_env = os.environ.get('MBTI_DATA_PATH')
+data_option = st.sidebar.selectbox('Choose data source', data_options, index=2 if data_path_env else 0)
 
 if data_option.startswith('Demo'):
     df = load_sample_data()
+elif data_option.startswith('Local'):
+    data_path = st.sidebar.text_input('Path', value=data_path_env or 'mbti_by_country.csv')
+    try:
+        df = external_cache(load_external_data, data_path, loaders.fingerprint(data_path))
+        st.success(f'Showing {len(df)} rows from {data_path}')
+        dropped = df.attrs.get('dropped')
+        if dropped:
+            st.warning(f'Skipped {sum(dropped.values())} invalid rows: '
+                       + ', '.join(f'{n} {reason}' for reason, n in dropped.items()))
+    except loaders.DatasetError as e:
+        st.error('Could not load dataset: ' + str(e))
+        st.info('Falling back to demo sample data')
+        df = load_sample_data()
 else:
-    with st.spinner('Attempting to scrape 16Personalities (may fail)...'):
-        try:
-            df = scrape_16personalities_world()
-            st.success('Scrape successful — showing scraped results')
-        except Exception as e:
-            st.error('Scraping failed: ' + str(e))
-            st.info('Falling back to demo sample data')
-            df = load_sample_data()
-
-# ensure iso column
+    refresher = None if os.environ.get('MBTI_EXTERNAL_WORKER') else get_refresher()
+    if refresher is not None:
+        full_rescrape = st.sidebar.checkbox('Full re-scrape (ignore stored countries)', value=False)
+        if st.sidebar.button('Refresh stale / failed countries'):
+            refresher.request_refresh(force=full_rescrape)
+            st.sidebar.info('Refresh started in the background')
+    version = snapshots.latest_version()
+    if version:
+        df = snapshot_cache(snapshot_frame, version)
+        st.success(f'Showing scraped snapshot {version}')
+    else:
+        if refresher is not None and refresher.last_error is not None:
+            st.error('Scraping failed: ' + str(refresher.last_error))
+        else:
+            st.info('No scraped snapshot yet — a background refresh is building one.')
+        st.info('Falling back to demo sample data')
+        df = load_sample_data()
+
+# ensure iso column (the resolver is only needed when codes are missing)
 if 'iso_alpha3' not in df.columns:
-    df['iso_alpha3'] = df['country'].apply(country_to_iso3)
+    df['iso_alpha3'] = country_resolver().resolve_series(df['country'])
+elif df['iso_alpha3'].isna().any():
+    # e.g. shards where only some files carry ISO codes
+    df['iso_alpha3'] = df['iso_alpha3'].astype(object).where(df['iso_alpha3'].notna(), country_resolver().resolve_series(df['country']))
+unresolved = sorted(set(df.loc[df['iso_alpha3'].isna(), 'country']))
+if unresolved:
+    st.warning('No ISO code for: ' + ', '.join(unresolved) + ' — these countries are not shown on the map.')
 
 # drop rows without iso
 df_display = df.dropna(subset=['iso_alpha3']).copy()
 
-# color map: map MBTI types to numeric categories for consistent coloring
-mbti_types = sorted(df_display['top_type'].unique())
-mapping = {t:i for i,t in enumerate(mbti_types)}
-df_display['type_id'] = df_display['top_type'].map(mapping)
-
-fig = px.choropleth(df_display,
-                    locations='iso_alpha3',
-                    color='top_type',
-                    hover_name='country',
-                    hover_data=['top_type','percentage'],
-                    color_discrete_sequence=px.colors.qualitative.Plotly,
-                    category_orders={ 'top_type': mbti_types },
-                    projection='natural earth')
-fig.update_layout(margin=dict(l=0,r=0,t=30,b=0))
+st.sidebar.header('Display')
+color_options = [m for m in METRICS if m in df_display.columns]
+color_by = st.sidebar.selectbox('Color countries by', color_options, format_func=METRICS.get) if len(color_options) > 1 else 'top_type'
+# the outline is served from ./static, which needs server.enableStaticServing (.streamlit/config.toml)
+local_geojson = st.sidebar.checkbox('Use bundled world outline (no Plotly topology download)', value=False,
+                                    disabled=not st.get_option('server.enableStaticServing'),
+                                    help='Needs server.enableStaticServing = true')
+fig = figure_cache(choropleth_figure, dataset_version(df_display), local_geojson, color_by, df_display)
 
 st.plotly_chart(fig, use_container_width=True)
 
@@ -200,6 +197,28 @@ st.plotly_chart(fig, use_container_width=True)
 with st.expander('Raw data (preview)'):
     st.dataframe(df_display[['country','iso_alpha3','top_type','percentage']])
 
+# ------------------------------
+# Debug: instrumentation
+# ------------------------------
+
+metrics.observe_stage('rerun', time.perf_counter() - rerun_started)
+
+# MBTI_METRICS_FILE: publish the Prometheus text file (at most every 10s) for a textfile collector
+metrics_file = os.environ.get('MBTI_METRICS_FILE')
+if metrics_file and time.time() - st.session_state.get('_metrics_written', 0) > 10:
+    metrics.REGISTRY.write_textfile(metrics_file)
+    st.session_state['_metrics_written'] = time.time()
+
+with st.expander('Debug: performance metrics'):
+    st.markdown('**Stage latency** (percentiles are histogram bucket bounds)')
+    st.dataframe(metrics.REGISTRY.stages(), hide_index=True)
+    st.markdown('**Cache hit ratios**')
+    st.dataframe(metrics.REGISTRY.cache_ratios(), hide_index=True)
+    st.markdown('**Counters**')
+    st.dataframe(metrics.REGISTRY.counters(), hide_index=True)
+    st.download_button('Download Prometheus metrics', data=metrics.REGISTRY.to_prometheus(),
+                       file_name='mbti_metrics.prom', mime='text/plain')
+
 st.markdown('---')
 st.markdown('**Sources & notes**')
 st.markdown('- 16Personalities country profiles (aggregated user responses; sample sizes vary; self-selected online testers). See their Country Profiles pages.')
@@ -0,0 +1 @@
+"""Data layer for the MBTI-by-country map (scraping, parsing, country resolution)."""
@@ -0,0 +1,144 @@
+"""Country name -> ISO alpha-3 resolution.
+
+`CountryResolver` builds one normalized-name index over pycountry (names, official and common
+names, alpha-2/3 codes, "Korea, Republic of" style inversions) plus hand-written aliases, so a
+lookup is a dict hit instead of pycountry's attribute scan with an exception on every miss.
+Results are memoized, and `resolve_series` maps a whole column with one lookup per distinct
+name. Names that can't be resolved come back as None (missing in the Series) and are counted in
+metrics; callers report them per dataset (main.py lists the countries it can't place on the map).
+"""
+
+import re
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+
+# common names (and URL slugs) that none of pycountry's attributes match
+ALIASES = {
+    'United States': 'USA',
+    'United States of America': 'USA',
+    'South Korea': 'KOR',
+    'North Korea': 'PRK',
+    'Russia': 'RUS',
+    'Czech Republic': 'CZE',
+    'Iran': 'IRN',
+    'Syria': 'SYR',
+    'Venezuela': 'VEN',
+    'Bolivia': 'BOL',
+    'Vietnam': 'VNM',
+    'Tanzania': 'TZA',
+    'Laos': 'LAO',
+    'Turkey': 'TUR',
+    'Ivory Coast': 'CIV',
+    'Cape Verde': 'CPV',
+    'Macedonia': 'MKD',
+    'Swaziland': 'SWZ',
+    'Burma': 'MMR',
+    'Brunei': 'BRN',
+    'Moldova': 'MDA',
+    'Micronesia': 'FSM',
+    'Palestine': 'PSE',
+    'Vatican': 'VAT',
+    'Vatican City': 'VAT',
+    'East Timor': 'TLS',
+    'Bosnia': 'BIH',
+    'Bosnia Herzegovina': 'BIH',
+    'Democratic Republic of the Congo': 'COD',
+    'DR Congo': 'COD',
+    'Congo Kinshasa': 'COD',
+    'Republic of the Congo': 'COG',
+    'Congo Brazzaville': 'COG',
+    'UK': 'GBR',
+    'Great Britain': 'GBR',
+    'UAE': 'ARE',
+}
+
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r'\s+')
+
+
+def normalize(name):
+    """Lower-case, accent-free, punctuation-free form used as index key ('Côte-d'Ivoire' -> 'cote d ivoire')."""
+    name = unicodedata.normalize('NFKD', str(name))
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch)).casefold()
+    name = name.replace('&', ' and ').replace('_', ' ')
+    name = _SPACE.sub(' ', _PUNCT.sub(' ', name)).strip()
+    if name.startswith('the '):
+        name = name[4:]
+    return name
+
+
+class CountryResolver:
+    def __init__(self, aliases=ALIASES):
+        self.aliases = aliases
+        self._index = None
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        """Load pycountry's database and build the index now instead of on the first lookup."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    with metrics.timer('resolver_warm_up'):
+                        self._index = self._build_index()
+        return self
+
+    def _build_index(self):
+        import pycountry  # ~100 ms with its JSON database; only needed once the index is built
+
+        index = {}
+        for country in pycountry.countries:
+            for attr in ('alpha_2', 'alpha_3', 'name', 'official_name', 'common_name'):
+                value = getattr(country, attr, None)
+                if not value:
+                    continue
+                index.setdefault(normalize(value), country.alpha_3)
+                if ', ' in value:
+                    # 'Korea, Republic of' -> 'Republic of Korea'
+                    head, _, tail = value.partition(', ')
+                    index.setdefault(normalize(f'{tail} {head}'), country.alpha_3)
+        # aliases win over pycountry's own (sometimes ambiguous) entries
+        index.update({normalize(k): v for k, v in self.aliases.items()})
+        return index
+
+    def resolve(self, name):
+        """ISO alpha-3 code for `name`, or None (counted in `mbti_resolve_total{outcome="unresolved"}`)."""
+        try:
+            iso = self._memo[name]
+        except KeyError:
+            pass
+        else:
+            metrics.cache_lookup('resolver', hit=True)
+            return iso
+        metrics.cache_lookup('resolver', hit=False)
+        if self._index is None:
+            self.warm_up()
+        iso = self._index.get(normalize(name)) if name is not None else None
+        metrics.inc('mbti_resolve_total', outcome='resolved' if iso else 'unresolved')
+        self._memo[name] = iso
+        return iso
+
+    def resolve_series(self, names):
+        """Vectorized `resolve` over a pandas Series: each distinct name is looked up once."""
+        with metrics.timer('resolve'):
+            codes, uniques = pd.factorize(names)
+            resolved = np.array([self.resolve(u) for u in uniques] + [None], dtype=object)
+        # factorize gives -1 for missing values, which picks the trailing None
+        return pd.Series(resolved[codes], index=names.index, name='iso_alpha3')
+
+
+_default = CountryResolver()
+
+
+def get_resolver():
+    """The process-wide resolver shared by the scraper and the app."""
+    return _default
+
+
+def country_to_iso3(name):
+    return _default.resolve(name)
@@ -0,0 +1,162 @@
+"""Concurrent HTTP crawler used by the 16Personalities scraper.
+
+- A bounded thread pool fetches pages in parallel over one shared keep-alive ``requests.Session``.
+- Requests to the same host are spaced out by a per-host rate limiter.
+- Connection errors, timeouts and 429/5xx answers are retried with exponential backoff
+  (Retry-After is honoured up to ``max_backoff``; a server asking for longer is not retried);
+  when they persist, a cached copy (even a stale one) is returned instead of the error.
+- With an ``HttpCache`` attached, fresh pages come from disk and stale ones are revalidated
+  with a conditional GET (If-None-Match / If-Modified-Since).
+- ``Crawler.crawl`` yields pages as they complete, so callers can stream results.
+
+The crawler knows nothing about 16Personalities; point it at any base URL (e.g. a local
+``http.server`` stub) to exercise it without touching the real site.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import metrics
+
+DEFAULT_HEADERS = {'User-Agent': 'mbti-country-map-bot/1.0 (demo)'}
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# one fetched page; `error` is set (and `status` is None) when every attempt failed.
+# `fetched_at` is when `text` was last confirmed by the server. `stale` marks a cached copy
+# returned because the server couldn't be reached: `status` / `error` then describe the failure.
+Page = namedtuple('Page', ['url', 'status', 'text', 'error', 'from_cache', 'fetched_at', 'stale'],
+                  defaults=[False, None, False])
+
+
+class HostRateLimiter:
+    """Allow at most `rate` requests per second to each host (0 disables limiting)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Crawler:
+    def __init__(self, max_workers=8, per_host_rate=5.0, retries=3, backoff=0.5,
+                 timeout=10, headers=None, cache=None, max_backoff=60):
+        self.cache = cache
+        self.max_backoff = max_backoff
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = HostRateLimiter(per_host_rate)
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        # one keep-alive connection per worker, shared across all requests to a host
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def _retry_delay(self, attempt, resp=None):
+        """Seconds to wait before the next attempt, or None if the server asks for more than max_backoff."""
+        delay = min(self.backoff * (2 ** attempt), self.max_backoff)
+        retry_after = resp.headers.get('Retry-After') if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            if float(retry_after) > self.max_backoff:
+                # don't park a pool worker (and the refresh) for hours; give up on this URL
+                return None
+            delay = max(delay, float(retry_after))
+        return delay
+
+    def fetch(self, url, timeout=None):
+        """Fetch one URL with caching, rate limiting and retries. Never raises for HTTP/network errors."""
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and self.cache.is_fresh(entry):
+            metrics.cache_lookup('http', hit=True)
+            metrics.inc('mbti_fetch_total', outcome='cached')
+            return Page(url, entry.status, entry.text, None, True, entry.fetched_at)
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        host = urlsplit(url).netloc
+        error = status = None
+        for attempt in range(self.retries + 1):
+            self.limiter.wait(host)
+            try:
+                with metrics.timer('fetch'):
+                    resp = self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+            except requests.RequestException as e:
+                error = e
+                metrics.inc('mbti_fetch_total', outcome='retry' if attempt < self.retries else 'error')
+                if attempt < self.retries:
+                    time.sleep(self._retry_delay(attempt))
+                continue
+            if resp.status_code in RETRY_STATUSES:
+                delay = self._retry_delay(attempt, resp) if attempt < self.retries else None
+                if delay is not None:
+                    metrics.inc('mbti_fetch_total', outcome='retry')
+                    time.sleep(delay)
+                    continue
+                if entry is not None:
+                    # still failing after the last retry: same as a network error, use the stale copy
+                    error = requests.HTTPError(f'HTTP {resp.status_code}', response=resp)
+                    status = resp.status_code
+                    break
+            if self.cache is not None:
+                metrics.cache_lookup('http', hit=resp.status_code == 304 and entry is not None)
+            if resp.status_code == 304 and entry is not None:
+                metrics.inc('mbti_fetch_total', outcome='revalidated')
+                self.cache.revalidated(url)
+                return Page(url, entry.status, entry.text, None, True, time.time())
+            metrics.inc('mbti_fetch_total', outcome='ok' if resp.status_code == 200 else 'http_error')
+            if resp.status_code == 200 and self.cache is not None:
+                self.cache.put(url, resp.status_code, resp.text,
+                               resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+            return Page(url, resp.status_code, resp.text, None, False, time.time())
+        if entry is not None:
+            # upstream is down: a stale copy beats no data, but callers must not take it as a fetch
+            metrics.inc('mbti_fetch_total', outcome='stale')
+            return Page(url, status, entry.text, error, True, entry.fetched_at, True)
+        return Page(url, None, None, error)
+
+    def crawl(self, urls):
+        """Fetch `urls` concurrently and yield a `Page` for each one in completion order."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self.fetch, url) for url in urls]
+            try:
+                for fut in as_completed(futures):
+                    yield fut.result()
+            finally:
+                # consumer stopped early: don't keep fetching pages nobody will read
+                for fut in futures:
+                    fut.cancel()
@@ -0,0 +1,160 @@
+"""Full per-country MBTI distribution, stored as a dense country x type matrix.
+
+`MbtiDataset` keeps the 16-type percentage matrix (float32, NaN where unknown, columns in
+`parse.TYPES` order) next to per-country sample sizes and fetch timestamps. Derived views
+(top type, top-k, I/E, S/N, T/F, J/P shares) are computed with NumPy on the whole matrix.
+
+On disk a dataset is a directory of `.npy` files plus a small `meta.json`; `load(..., mmap=True)`
+memory-maps the arrays so opening a snapshot doesn't copy them into every process.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .parse import TYPES
+
+# letter counted as the axis share -> its position in a type code; E = 100 - I, S = 100 - N, ...
+AXES = {'I': 0, 'N': 1, 'F': 2, 'P': 3}
+
+_ARRAYS = ('shares', 'sample_size', 'fetched_at')
+
+
+def _axis_masks():
+    return {letter: np.array([t[pos] == letter for t in TYPES], dtype=np.float32)
+            for letter, pos in AXES.items()}
+
+
+class MbtiDataset:
+    def __init__(self, countries, iso_alpha3, shares, sample_size=None, fetched_at=None):
+        n = len(countries)
+        self.countries = np.asarray(countries, dtype=object)
+        self.iso_alpha3 = np.asarray(iso_alpha3, dtype=object)
+        self.shares = np.asarray(shares, dtype=np.float32).reshape(n, len(TYPES))
+        self.sample_size = (np.full(n, np.nan, dtype=np.float32) if sample_size is None
+                            else np.asarray(sample_size, dtype=np.float32))
+        self.fetched_at = (np.full(n, np.datetime64('NaT'), dtype='datetime64[s]') if fetched_at is None
+                           else np.asarray(fetched_at, dtype='datetime64[s]'))
+
+    def __len__(self):
+        return len(self.countries)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from scraper rows: a `distribution` dict per row, or just top_type/percentage."""
+        n = len(df)
+        shares = np.full((n, len(TYPES)), np.nan, dtype=np.float32)
+        col = {t: j for j, t in enumerate(TYPES)}
+        dists = df['distribution'] if 'distribution' in df.columns else pd.Series([None] * n, index=df.index)
+        for i, (dist, ttype, perc) in enumerate(zip(dists, df['top_type'], df['percentage'])):
+            if not isinstance(dist, dict) or not dist:
+                dist = {ttype: perc}
+            for t, p in dist.items():
+                if t in col:
+                    shares[i, col[t]] = np.nan if p is None else p
+        sample_size = df['sample_size'].to_numpy(dtype=np.float32, na_value=np.nan) if 'sample_size' in df.columns else None
+        fetched_at = pd.to_datetime(df['fetched_at']).to_numpy(dtype='datetime64[s]') if 'fetched_at' in df.columns else None
+        iso = df['iso_alpha3'] if 'iso_alpha3' in df.columns else [None] * n
+        return cls(df['country'].to_numpy(dtype=object), iso, shares, sample_size, fetched_at)
+
+    # ------------------------------
+    # vectorized views
+    # ------------------------------
+
+    def top_k(self, k=3):
+        """(codes, percentages), both (N, k): best types first; code -1 where fewer than k are known."""
+        filled = np.where(np.isnan(self.shares), -np.inf, self.shares)
+        codes = np.argsort(-filled, axis=1, kind='stable')[:, :k]
+        values = np.take_along_axis(self.shares, codes, axis=1)
+        codes = np.where(np.isnan(values), -1, codes)
+        return codes, values
+
+    def top_type(self):
+        """Categorical of each country's most common type (NaN where nothing is known) and its percentage."""
+        codes, values = self.top_k(1)
+        return pd.Categorical.from_codes(codes[:, 0], categories=list(TYPES)), values[:, 0]
+
+    def axis_shares(self, min_known=len(TYPES) // 2):
+        """Share (0-100) of I, N, F and P among the known types of each country.
+
+        NaN for countries with fewer than `min_known` known types, where the share would
+        mostly reflect which types the page happened to list.
+        """
+        known = np.nan_to_num(self.shares)
+        total = known.sum(axis=1)
+        enough = (self.known_types() >= min_known) & (total > 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = {letter: np.where(enough, 100 * (known @ mask) / total, np.nan)
+                   for letter, mask in _axis_masks().items()}
+        return pd.DataFrame(out, index=self.countries)
+
+    def known_types(self):
+        """How many of the 16 types have a value, per country."""
+        return (~np.isnan(self.shares)).sum(axis=1)
+
+    def to_frame(self, axis_shares=False):
+        """The app's display schema (country, iso_alpha3, top_type, percentage) plus metadata,
+        and the I/N/F/P share columns with `axis_shares=True`."""
+        top, perc = self.top_type()
+        df = pd.DataFrame({
+            'country': self.countries,
+            'iso_alpha3': self.iso_alpha3,
+            'top_type': top,
+            'percentage': perc,
+            'sample_size': self.sample_size,
+            'fetched_at': self.fetched_at,
+        })
+        if axis_shares:
+            df = df.join(self.axis_shares().reset_index(drop=True))
+        return df.dropna(subset=['top_type']).reset_index(drop=True)
+
+    # ------------------------------
+    # storage
+    # ------------------------------
+
+    def save(self, path):
+        """Write to directory `path` atomically (written next to it, then renamed into place).
+
+        If another writer already put a complete dataset at `path`, that one is kept.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=path.parent, prefix='.' + path.name))
+        try:
+            for name in _ARRAYS:
+                np.save(tmp / f'{name}.npy', getattr(self, name))
+            meta = {'types': list(TYPES), 'countries': self.countries.tolist(),
+                    'iso_alpha3': [None if pd.isna(v) else v for v in self.iso_alpha3]}
+            with open(tmp / 'meta.json', 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            try:
+                os.replace(tmp, path)
+            except OSError:
+                # os.replace can't overwrite a non-empty directory; snapshot names include a
+                # content hash, so an existing one holds the same data
+                if not (path / 'meta.json').exists():
+                    raise
+                shutil.rmtree(tmp, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        path = Path(path)
+        with open(path / 'meta.json', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['types'] != list(TYPES):
+            raise ValueError(f'{path}: unexpected type order {meta["types"]}')
+        arrays = {name: np.load(path / f'{name}.npy', mmap_mode='r' if mmap else None) for name in _ARRAYS}
+        ds = cls.__new__(cls)
+        ds.countries = np.asarray(meta['countries'], dtype=object)
+        ds.iso_alpha3 = np.asarray(meta['iso_alpha3'], dtype=object)
+        for name, arr in arrays.items():
+            setattr(ds, name, arr)
+        return ds
@@ -0,0 +1,172 @@
+"""World choropleth construction.
+
+`dataset_version` gives a content hash of the displayed rows, which the app uses (together
+with the display options) as the key of its figure cache. `freeze` serializes a built figure
+once, so reruns that show the same data skip both `px.choropleth` and the figure -> JSON step.
+
+`static/world.geojson` is a simplified Natural Earth 1:110m country outline (public domain,
+coordinates rounded to 0.01°) keyed by ISO alpha-3. With `local_geojson=True` the map is drawn
+from it instead of Plotly's built-in world topology. The figure only references it by URL
+(Streamlit serves `static/` at `app/static/` with `server.enableStaticServing`), so the
+browser downloads and caches it once instead of receiving it inside every figure.
+
+Plotly is imported when the first figure is built (or by `warm_up`), not with this module.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from . import metrics
+
+WORLD_GEOJSON = Path(__file__).resolve().parent.parent / 'static' / 'world.geojson'
+WORLD_GEOJSON_URL = 'app/static/world.geojson'
+
+DISPLAY_COLUMNS = ['country', 'iso_alpha3', 'top_type', 'percentage']
+
+# what the map can be colored by; the axis letters are MbtiDataset.axis_shares() columns
+METRICS = {
+    'top_type': 'Most common type',
+    'I': 'Introverted (I) share %',
+    'N': 'Intuitive (N) share %',
+    'F': 'Feeling (F) share %',
+    'P': 'Perceiving (P) share %',
+}
+NO_DATA = '#e5e5e5'
+
+
+def dataset_version(df):
+    """Short content hash of the displayed columns of `df` (including any metric columns)."""
+    columns = DISPLAY_COLUMNS + [c for c in METRICS if c in df.columns and c not in DISPLAY_COLUMNS]
+    hashed = pd.util.hash_pandas_object(df[columns], index=False)
+    return hashlib.sha1(hashed.values.tobytes()).hexdigest()[:16]
+
+
+def warm_up():
+    """Import plotly.express and load the default template (both ~once per process)."""
+    import plotly.express  # noqa: F401
+    import plotly.io as pio
+
+    pio.templates[pio.templates.default]
+
+
+@lru_cache(maxsize=1)
+def _frozen_figure_class():
+    import plotly.graph_objects as go
+
+    class FrozenFigure(go.Figure):
+        # st.plotly_chart calls to_dict() and JSON-encodes the result on every run; this
+        # figure hands out one prebuilt plain dict (what `to_json` produced), so a rerun
+        # only pays for encoding plain lists and strings
+        def __init__(self, fig):
+            super().__init__()
+            self._spec = json.loads(fig.to_json())
+
+        def to_dict(self):
+            return self._spec
+
+    return FrozenFigure
+
+
+def freeze(fig):
+    """`fig` serialized once, for caching and sharing between sessions. Read-only from here on."""
+    with metrics.timer('figure_serialize'):
+        return _frozen_figure_class()(fig)
+
+
+@lru_cache(maxsize=1)
+def world_geojson():
+    with open(WORLD_GEOJSON, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _discrete_colorscale(colors):
+    """Step colorscale giving value i (of 0..len(colors)-1) exactly colors[i]."""
+    n = len(colors)
+    scale = []
+    for i, color in enumerate(colors):
+        scale += [[i / n, color], [(i + 1) / n, color]]
+    return scale
+
+
+def _local_choropleth(df_display, color, mbti_types):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    # one trace holding every bundled country, drawn from the outline at WORLD_GEOJSON_URL (the
+    # server only reads the file for the ids and names); countries without data get a grey
+    # band below the data range
+    gj = world_geojson()
+    ids = [f['id'] for f in gj['features']]
+    names = [f['properties']['name'] for f in gj['features']]
+    rows = df_display.drop_duplicates('iso_alpha3').set_index('iso_alpha3').reindex(ids)
+    has_data = rows['country'].notna().to_numpy()
+
+    if color == 'top_type':
+        palette = px.colors.qualitative.Plotly
+        codes = {t: i for i, t in enumerate(mbti_types)}
+        z = rows['top_type'].map(codes).astype(float).fillna(-1).to_numpy()
+        colorscale = _discrete_colorscale([NO_DATA] + [palette[i % len(palette)] for i in range(len(mbti_types))])
+        zmin, zmax = -1.5, len(mbti_types) - 0.5
+        colorbar = dict(title='top_type', tickvals=list(range(len(mbti_types))), ticktext=mbti_types)
+        detail = 'percentage=' + rows['percentage'].astype(str)
+    else:
+        band = 10.0
+        z = rows[color].astype(float).fillna(-band).to_numpy()
+        seq = px.colors.sequential.Viridis
+        edge = band / (100 + band)
+        colorscale = [[0, NO_DATA], [edge, NO_DATA]] + [[edge + (1 - edge) * i / (len(seq) - 1), c] for i, c in enumerate(seq)]
+        zmin, zmax = -band, 100
+        colorbar = dict(title=METRICS[color], tickvals=[0, 25, 50, 75, 100])
+        detail = f'{color}=' + rows[color].round(1).astype(str)
+
+    label = '<b>' + rows['country'].astype(str) + '</b><br>top_type=' + rows['top_type'].astype(str) + '<br>' + detail
+    text = [t if ok else name for t, ok, name in zip(label, has_data, names)]
+    fig = go.Figure(go.Choropleth(
+        geojson=WORLD_GEOJSON_URL, featureidkey='id', locations=ids, z=z, zmin=zmin, zmax=zmax,
+        colorscale=colorscale, text=text, hovertemplate='%{text}<extra></extra>',
+        marker_line_color='white', marker_line_width=0.5, colorbar=colorbar,
+    ))
+    fig.update_geos(visible=False, projection_type='natural earth')
+    return fig
+
+
+def build_choropleth(df_display, local_geojson=False, color='top_type'):
+    """World map colored by `color`: 'top_type' (categorical) or an axis share column from METRICS.
+
+    `df_display` needs DISPLAY_COLUMNS (plus the `color` column) and no missing ISO codes.
+    """
+    with metrics.timer('figure_build'):
+        return _build_choropleth(df_display, local_geojson, color)
+
+
+def _build_choropleth(df_display, local_geojson, color):
+    import plotly.express as px
+
+    mbti_types = sorted(df_display['top_type'].unique())
+    if local_geojson:
+        fig = _local_choropleth(df_display, color, mbti_types)
+    elif color == 'top_type':
+        fig = px.choropleth(df_display,
+                            locations='iso_alpha3',
+                            color='top_type',
+                            hover_name='country',
+                            hover_data=['top_type','percentage'],
+                            color_discrete_sequence=px.colors.qualitative.Plotly,
+                            category_orders={ 'top_type': mbti_types },
+                            projection='natural earth')
+    else:
+        fig = px.choropleth(df_display,
+                            locations='iso_alpha3',
+                            color=color,
+                            hover_name='country',
+                            hover_data=['top_type', color],
+                            color_continuous_scale='Viridis',
+                            range_color=(0, 100),
+                            labels={color: METRICS[color]},
+                            projection='natural earth')
+    fig.update_layout(margin=dict(l=0,r=0,t=30,b=0))
+    return fig
@@ -0,0 +1,101 @@
+"""Persistent HTTP response cache (SQLite) for the scraper.
+
+Entries are keyed by URL and keep the response body together with its ETag / Last-Modified
+validators and an expiry time:
+
+- fresh entries are served without touching the network, so a restart costs no fetches;
+- stale entries are revalidated with a conditional GET and only re-downloaded on change;
+- the total body size is bounded, least-recently-used entries are evicted first.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+Entry = namedtuple('Entry', ['url', 'status', 'text', 'etag', 'last_modified', 'fetched_at', 'expires_at'])
+
+
+def default_cache_dir():
+    """`$MBTI_CACHE_DIR`, or `.cache/` next to the app."""
+    path = os.environ.get('MBTI_CACHE_DIR')
+    return Path(path) if path else Path(__file__).resolve().parent.parent / '.cache'
+
+
+class HttpCache:
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path) if path else default_cache_dir() / 'http.sqlite'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # shared by the crawler's worker threads; every access goes through self._lock
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' url TEXT PRIMARY KEY, status INTEGER, body TEXT, etag TEXT, last_modified TEXT,'
+            ' fetched_at REAL, expires_at REAL, size INTEGER, accessed_at REAL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)')
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def get(self, url):
+        """Return the cached `Entry` for `url` (fresh or stale), or None."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT url, status, body, etag, last_modified, fetched_at, expires_at'
+                ' FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            self._db.commit()
+        return Entry(*row)
+
+    @staticmethod
+    def is_fresh(entry, now=None):
+        return entry.expires_at > (now or time.time())
+
+    def put(self, url, status, text, etag=None, last_modified=None):
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, status, text, etag, last_modified, now, now + self.ttl, size, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def revalidated(self, url):
+        """Mark an entry fresh again after the server answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'UPDATE responses SET expires_at = ?, accessed_at = ? WHERE url = ?',
+                (now + self.ttl, now, url),
+            )
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute('SELECT url, size FROM responses ORDER BY accessed_at').fetchall()
+        doomed = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((url,))
+            total -= size
+        self._db.executemany('DELETE FROM responses WHERE url = ?', doomed)
@@ -0,0 +1,158 @@
+"""Load country-level MBTI datasets from external files.
+
+`read_dataset` accepts a CSV, Parquet, JSON or JSON Lines file, or a directory of such shards.
+Files are read in chunks (CSV / JSON Lines / Parquet row batches), each chunk is validated
+and coerced to the app schema, and the result uses categoricals for the string columns and
+float32 for percentages:
+
+    country, top_type, percentage            required
+    iso_alpha3, sample_size                  optional (ISO codes are resolved if missing)
+
+Rows with a blank country, a missing or unparseable top_type / percentage, or a top_type that
+isn't one of the 16 types are dropped; `df.attrs['dropped']` counts them by reason so the app
+can say how many were skipped.
+
+`fingerprint` identifies the content of a path cheaply: files are only re-hashed when their
+mtime or size changed, so the app can key its cache on it and never re-parse unchanged files.
+"""
+
+import hashlib
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .parse import TYPES
+
+REQUIRED = ['country', 'top_type', 'percentage']
+OPTIONAL = ['iso_alpha3', 'sample_size']
+SUFFIXES = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet',
+            '.json': 'json', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+CHUNK_ROWS = 100_000
+
+# (path, mtime_ns, size) -> sha1 of the file's bytes
+_hash_memo = {}
+
+
+class DatasetError(ValueError):
+    """The file can't be read or doesn't match the expected schema."""
+
+
+def dataset_files(path):
+    """The data files behind `path`: the file itself, or the supported shards of a directory."""
+    path = Path(path)
+    if path.is_dir():
+        files = sorted(p for p in path.iterdir() if p.suffix.lower() in SUFFIXES and not p.name.startswith('.'))
+        if not files:
+            raise DatasetError(f'{path}: no {", ".join(sorted(SUFFIXES))} files in directory')
+        return files
+    if not path.exists():
+        raise DatasetError(f'{path}: no such file or directory')
+    if path.suffix.lower() not in SUFFIXES:
+        raise DatasetError(f'{path}: unsupported file type {path.suffix!r}')
+    return [path]
+
+
+def _file_hash(path):
+    st = path.stat()
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    digest = _hash_memo.get(key)
+    if digest is None:
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        digest = _hash_memo[key] = h.hexdigest()
+    return digest
+
+
+def fingerprint(path):
+    """Content hash of everything `read_dataset(path)` would read."""
+    h = hashlib.sha1()
+    for f in dataset_files(path):
+        h.update(f.name.encode('utf-8'))
+        h.update(_file_hash(f).encode('ascii'))
+    return h.hexdigest()
+
+
+def _wanted(column):
+    return column in REQUIRED or column in OPTIONAL
+
+
+def _iter_chunks(path):
+    kind = SUFFIXES[path.suffix.lower()]
+    if kind == 'csv':
+        yield from pd.read_csv(path, usecols=_wanted, chunksize=CHUNK_ROWS,
+                               dtype={'country': str, 'iso_alpha3': str, 'top_type': str})
+    elif kind == 'jsonl':
+        yield from pd.read_json(path, lines=True, chunksize=CHUNK_ROWS, dtype=False)
+    elif kind == 'json':
+        # a plain JSON array has to be parsed whole; use JSON Lines for large files
+        yield pd.read_json(path, orient='records', dtype=False)
+    else:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise DatasetError(f'{path}: reading Parquet needs pyarrow (pip install pyarrow)') from None
+        pf = pq.ParquetFile(path)
+        columns = [c for c in pf.schema_arrow.names if _wanted(c)]
+        for batch in pf.iter_batches(batch_size=CHUNK_ROWS, columns=columns):
+            yield batch.to_pandas()
+
+
+def _coerce(chunk, path, dropped):
+    missing = [c for c in REQUIRED if c not in chunk.columns]
+    if missing:
+        raise DatasetError(f'{path}: missing required column(s) {", ".join(missing)}')
+    # the nullable string dtype keeps blanks as <NA> (astype(str) would turn them into 'nan')
+    out = pd.DataFrame({
+        'country': chunk['country'].astype('string').str.strip().replace('', pd.NA),
+        'top_type': chunk['top_type'].astype('string').str.strip().str.upper()
+                    .str.replace(r'-[AT]$', '', regex=True).replace('', pd.NA),
+        'percentage': pd.to_numeric(chunk['percentage'], errors='coerce').astype(np.float32),
+    })
+    if 'iso_alpha3' in chunk.columns:
+        out['iso_alpha3'] = chunk['iso_alpha3'].astype('string').str.strip().str.upper()
+    if 'sample_size' in chunk.columns:
+        out['sample_size'] = pd.to_numeric(chunk['sample_size'], errors='coerce').astype(np.float32)
+    incomplete = out[REQUIRED].isna().any(axis=1)
+    # only '-A'/'-T' identity suffixes are cut above; anything else that isn't one of the 16 types is dropped
+    unknown = ~incomplete & ~out['top_type'].isin(TYPES).fillna(False).astype(bool)
+    dropped['with a missing or unparseable value'] += int(incomplete.sum())
+    dropped['with an unknown top_type'] += int(unknown.sum())
+    out = out[~(incomplete | unknown)]
+    out['country'] = out['country'].astype(object)
+    out['top_type'] = out['top_type'].astype(object)
+    return out
+
+
+def read_dataset(path):
+    """Read, validate and coerce the dataset at `path` (file or directory of shards)."""
+    with metrics.timer('load_external'):
+        return _read_dataset(path)
+
+
+def _read_dataset(path):
+    chunks = []
+    dropped = Counter()
+    for f in dataset_files(path):
+        try:
+            chunks.extend(_coerce(chunk, f, dropped) for chunk in _iter_chunks(f))
+        except DatasetError:
+            raise
+        except (ValueError, OSError) as e:
+            raise DatasetError(f'{f}: {e}') from e
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=REQUIRED)
+    if df.empty:
+        reasons = ', '.join(f'{n} {reason}' for reason, n in dropped.items() if n)
+        raise DatasetError(f'{path}: no valid rows' + (f' ({reasons})' if reasons else ''))
+    df['country'] = df['country'].astype('category')
+    df['top_type'] = pd.Categorical(df['top_type'], categories=list(TYPES))
+    if 'iso_alpha3' in df.columns:
+        df['iso_alpha3'] = df['iso_alpha3'].astype('category')
+    # put the columns in the app's usual order
+    df = df[[c for c in ['country', 'iso_alpha3', 'top_type', 'percentage', 'sample_size'] if c in df.columns]]
+    df.attrs['dropped'] = {reason: n for reason, n in dropped.items() if n}
+    return df
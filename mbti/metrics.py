@@ -0,0 +1,226 @@
+"""In-process instrumentation: stage latency histograms, counters and cache hit ratios.
+
+Everything is recorded in one process-wide `REGISTRY` (thread-safe; the crawler workers and
+the background refresher write to it concurrently):
+
+    with metrics.timer('parse'):             # mbti_stage_seconds{stage="parse"} histogram
+        ...
+    metrics.inc('mbti_fetch_total', outcome='error')
+    metrics.cache_lookup('http', hit=True)   # mbti_cache_requests_total{cache="http",result="hit"}
+
+`REGISTRY.to_prometheus()` renders the Prometheus text exposition format and
+`write_textfile` publishes it atomically (e.g. for node_exporter's textfile collector).
+"""
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+# seconds; covers a cached lookup (~1 ms) up to a slow full crawl
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 120.0)
+
+STAGE_HISTOGRAM = 'mbti_stage_seconds'
+CACHE_COUNTER = 'mbti_cache_requests_total'
+
+HELP = {
+    STAGE_HISTOGRAM: 'Latency of each pipeline stage.',
+    CACHE_COUNTER: 'Cache lookups by cache and result (hit/miss).',
+    'mbti_fetch_total': 'Page fetches by outcome.',
+    'mbti_parse_total': 'Country page parses by outcome.',
+    'mbti_resolve_total': 'Country name resolutions by outcome.',
+    'mbti_refresh_total': 'Background refreshes by outcome.',
+}
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bucket bound below which a fraction `q` of observations fall."""
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float('inf')
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join('%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs) + '}'
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram()
+            hist.observe(seconds)
+
+    def inc(self, name, n=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    # ------------------------------
+    # views
+    # ------------------------------
+
+    def stages(self):
+        """One row per stage: calls, mean / p50 / p95 latency in ms (percentiles are bucket bounds)."""
+        with self._lock:
+            items = [(dict(key).get('stage'), h.count, h.sum, h.quantile(0.5), h.quantile(0.95))
+                     for (name, key), h in self._histograms.items() if name == STAGE_HISTOGRAM]
+        rows = [{'stage': stage, 'calls': count, 'mean_ms': 1000 * total / count if count else 0.0,
+                 'p50_ms': 1000 * p50, 'p95_ms': 1000 * p95, 'total_s': total}
+                for stage, count, total, p50, p95 in items]
+        return pd.DataFrame(rows, columns=['stage', 'calls', 'mean_ms', 'p50_ms', 'p95_ms', 'total_s']).sort_values('stage')
+
+    def counters(self):
+        with self._lock:
+            items = list(self._counters.items())
+        rows = [{'counter': name, 'labels': _format_labels(key), 'value': value}
+                for (name, key), value in items if name != CACHE_COUNTER]
+        return pd.DataFrame(rows, columns=['counter', 'labels', 'value']).sort_values(['counter', 'labels'])
+
+    def cache_ratios(self):
+        """Hits, misses and hit ratio per cache."""
+        totals = {}
+        with self._lock:
+            for (name, key), value in self._counters.items():
+                if name == CACHE_COUNTER:
+                    labels = dict(key)
+                    totals.setdefault(labels['cache'], {'hit': 0, 'miss': 0})[labels['result']] += value
+        rows = [{'cache': cache, 'hits': t['hit'], 'misses': t['miss'],
+                 'hit_ratio': t['hit'] / (t['hit'] + t['miss']) if t['hit'] + t['miss'] else None}
+                for cache, t in sorted(totals.items())]
+        return pd.DataFrame(rows, columns=['cache', 'hits', 'misses', 'hit_ratio'])
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        declared = set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                if name in HELP:
+                    lines.append(f'# HELP {name} {HELP[name]}')
+                lines.append(f'# TYPE {name} {kind}')
+
+        for (name, key), h in histograms:
+            declare(name, 'histogram')
+            cumulative = 0
+            for bound, n in zip(BUCKETS, h.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{_format_labels(key, [("le", repr(bound))])} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(key, [("le", "+Inf")])} {h.count}')
+            lines.append(f'{name}_sum{_format_labels(key)} {h.sum!r}')
+            lines.append(f'{name}_count{_format_labels(key)} {h.count}')
+        for (name, key), value in counters:
+            declare(name, 'counter')
+            lines.append(f'{name}{_format_labels(key)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Atomically write `to_prometheus()` to `path`."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.' + path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+REGISTRY = Registry()
+
+
+@contextmanager
+def timer(stage, registry=REGISTRY):
+    """Record the duration of the block under mbti_stage_seconds{stage=...}, also when it raises."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(STAGE_HISTOGRAM, time.perf_counter() - t0, stage=stage)
+
+
+def observe_stage(stage, seconds):
+    REGISTRY.observe(STAGE_HISTOGRAM, seconds, stage=stage)
+
+
+def inc(name, n=1, **labels):
+    REGISTRY.inc(name, n, **labels)
+
+
+def cache_lookup(cache, hit):
+    REGISTRY.inc(CACHE_COUNTER, cache=cache, result='hit' if hit else 'miss')
+
+
+class CacheProbe:
+    """Hit/miss accounting for a memoizing wrapper (st.cache_data & co.) whose body only runs on a miss.
+
+    Call `probe.miss()` inside the cached function and go through `probe(fn, *args)` at the
+    call site.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._local = threading.local()
+
+    def miss(self):
+        self._local.missed = True
+
+    def __call__(self, fn, *args, **kwargs):
+        self._local.missed = False
+        result = fn(*args, **kwargs)
+        cache_lookup(self.cache, hit=not self._local.missed)
+        return result
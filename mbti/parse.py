@@ -0,0 +1,101 @@
+"""Single-pass MBTI extraction from 16Personalities country pages.
+
+Pages are parsed with lxml. Only text nodes inside the likely result containers are read
+(falling back to visible body text, never <script>/<style>), and one precompiled regex pass
+collects every `TYPE ... NN%` pair, giving the full 16-type distribution of a page.
+
+lxml is imported on the first parse, so modules that only need `TYPES` (the dataset and
+loaders) don't pull in the HTML stack.
+"""
+
+import re
+from functools import lru_cache
+
+# canonical order; also the column order of distribution matrices
+TYPES = ('ISTJ', 'ISFJ', 'INFJ', 'INTJ', 'ISTP', 'ISFP', 'INFP', 'INTP',
+         'ESTP', 'ESFP', 'ENFP', 'ENTP', 'ESTJ', 'ESFJ', 'ENFJ', 'ENTJ')
+
+_TYPE_ALT = '|'.join(TYPES)
+# a type code (optionally with the -A/-T identity suffix), then up to 40 non-digit chars, then `NN.N%`
+_TYPE_PCT = re.compile(r'\b(%s)(?:-[AT])?\b\D{0,40}?(\d{1,2}(?:\.\d+)?)\s*%%' % _TYPE_ALT)
+_TYPE = re.compile(r'\b(%s)\b' % _TYPE_ALT)
+# "based on 1,234,567 respondents" / "12 345 tests"
+_SAMPLE_SIZE = re.compile(r'(\d{1,3}(?:[ ,.]\d{3})+|\d+)\s+(?:respondents|responses|tests|test takers|people)\b', re.I)
+
+_VISIBLE_TEXT = 'text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::noscript)]'
+# containers that hold the type breakdown on profile pages, most specific first
+_RESULT_TEXT = (
+    '//*[contains(@class, "personality-type") or contains(@class, "type-distribution")'
+    ' or contains(@class, "country-profile") or @id="types"]//' + _VISIBLE_TEXT
+)
+_BODY_TEXT = '//body//' + _VISIBLE_TEXT
+_HREFS = '//a/@href'
+
+
+@lru_cache(maxsize=None)
+def _xpath(expr):
+    # compiled once per expression, on first use
+    from lxml import etree
+    return etree.XPath(expr)
+
+
+def _document(html):
+    from lxml import html as lxml_html
+    return lxml_html.fromstring(html.encode('utf-8') if isinstance(html, str) else html)
+
+
+def extract_distribution(text):
+    """Map each MBTI type found in `text` to its percentage (first occurrence wins)."""
+    dist = {}
+    for m in _TYPE_PCT.finditer(text):
+        dist.setdefault(m.group(1), float(m.group(2)))
+    if not dist:
+        # a type without any nearby percentage is still worth reporting
+        m = _TYPE.search(text)
+        if m:
+            dist[m.group(1)] = None
+    return dist
+
+
+def _distribution(doc):
+    nodes = _xpath(_RESULT_TEXT)(doc)
+    dist = extract_distribution(' '.join(nodes)) if nodes else {}
+    if not dist:
+        dist = extract_distribution(' '.join(_xpath(_BODY_TEXT)(doc)))
+    return dist
+
+
+def _sample_size(doc):
+    m = _SAMPLE_SIZE.search(' '.join(_xpath(_BODY_TEXT)(doc)))
+    return int(re.sub(r'\D', '', m.group(1))) if m else None
+
+
+def parse_distribution(html):
+    """Return {type: percentage} for every MBTI type on a country page (empty if none)."""
+    return _distribution(_document(html))
+
+
+def parse_country_page(html):
+    """(distribution, sample size or None) of a country page, parsing the document once."""
+    doc = _document(html)
+    return _distribution(doc), _sample_size(doc)
+
+
+def top_type(dist):
+    """(type, percentage) of the most common type in `dist`, or None if it is empty."""
+    if not dist:
+        return None
+    return max(dist.items(), key=lambda kv: -1.0 if kv[1] is None else kv[1])
+
+
+def country_links(html, base):
+    """Absolute URLs of all /country-profiles/ links on the world page, in page order."""
+    links = []
+    seen = set()
+    for href in _xpath(_HREFS)(_document(html)):
+        if href.startswith('/country-profiles/') and href.count('/') >= 2:
+            full = base + href
+            if full not in seen:
+                seen.add(full)
+                links.append(full)
+    return links
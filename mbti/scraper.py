@@ -0,0 +1,102 @@
+"""Best-effort scraper for 16personalities country pages (may not work if site requires JS)."""
+
+import logging
+import time
+from collections import namedtuple
+
+from . import metrics
+from .countries import country_to_iso3
+from .crawler import Crawler
+from .httpcache import HttpCache
+from .parse import country_links, parse_country_page, top_type
+from .state import DEFAULT_MAX_AGE, CountryState
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = 'https://www.16personalities.com'
+WORLD_PATH = '/country-profiles/global/world'
+
+# outcome of scraping one country page; `row` is None when it failed (see `error`). A stale
+# cached copy gives both: the `row` parsed from it (as of `fetched_at`) and the fetch `error`.
+CountryResult = namedtuple('CountryResult', ['url', 'country', 'row', 'status', 'error', 'fetched_at'],
+                           defaults=[None])
+
+
+def country_from_url(url):
+    # guess country name from URL
+    return url.rstrip('/').split('/')[-1].replace('-', ' ').title()
+
+
+def default_crawler():
+    """A crawler backed by the on-disk response cache."""
+    return Crawler(cache=HttpCache())
+
+
+def iter_country_results(urls, crawler):
+    """Fetch and parse country pages, yielding a `CountryResult` per URL as soon as it is done.
+
+    `row` is None for pages that failed to download or parse; `error` then says why.
+    """
+    for page in crawler.crawl(urls):
+        country = country_from_url(page.url)
+        if page.status != 200 and not page.stale:
+            yield CountryResult(page.url, country, None, page.status, str(page.error or f'HTTP {page.status}'))
+            continue
+        try:
+            with metrics.timer('parse'):
+                dist, sample_size = parse_country_page(page.text)
+        except Exception as e:
+            metrics.inc('mbti_parse_total', outcome='error')
+            yield CountryResult(page.url, country, None, page.status, f'parse error: {e!r}')
+            continue
+        metrics.inc('mbti_parse_total', outcome='ok' if dist else 'no_type')
+        if not dist:
+            yield CountryResult(page.url, country, None, page.status, 'no MBTI type found on page')
+            continue
+        ttype, perc = top_type(dist)
+        row = {'country': country, 'iso_alpha3': country_to_iso3(country), 'top_type': ttype,
+               'percentage': perc, 'distribution': dist, 'sample_size': sample_size}
+        error = f'upstream unavailable ({page.error or f"HTTP {page.status}"}), used cached copy' if page.stale else None
+        yield CountryResult(page.url, country, row, page.status, error, page.fetched_at)
+
+
+def scrape_16personalities_world(base=BASE_URL, crawler=None, state=None, max_age=DEFAULT_MAX_AGE, force=False):
+    """Try to gather country -> top MBTI + percentage (and the full type distribution) from
+    16personalities country profiles.
+    Returns a DataFrame or raises an exception if scraping clearly failed.
+
+    Incremental: only countries that are new, failed last time or older than `max_age` are
+    re-fetched (all of them with `force=True`); the rest keep the values stored in `state`.
+    """
+    own_crawler, own_state = crawler is None, state is None
+    crawler = crawler or default_crawler()
+    state = state or CountryState()
+    started = time.perf_counter()
+    try:
+        world = crawler.fetch(base + WORLD_PATH, timeout=15)
+        if world.status == 200 or world.stale:
+            links = country_links(world.text, base)
+            todo = links if force else state.stale_urls(links, max_age)
+            for result in iter_country_results(todo, crawler):
+                if result.row is not None:
+                    state.record_success(result.url, result.row, fetched_at=result.fetched_at)
+                if result.error is not None:
+                    logger.warning('Scraping %s failed: %s', result.url, result.error)
+                    state.record_failure(result.url, result.country, result.status, result.error)
+            df = state.frame()
+        else:
+            df = state.frame()
+            if df.empty:
+                raise RuntimeError(f"Failed to fetch world page: {world.status or world.error}")
+            logger.warning('World page unavailable (%s); keeping %d stored countries',
+                           world.status or world.error, len(df))
+    finally:
+        metrics.observe_stage('scrape', time.perf_counter() - started)
+        if own_crawler:
+            crawler.close()
+        if own_state:
+            state.close()
+
+    if df.empty:
+        raise RuntimeError('No results scraped — site may be JS-driven or blocking requests')
+    return df
@@ -0,0 +1,74 @@
+"""Versioned, atomically published dataset snapshots.
+
+The refresh worker writes each new dataset to a `countries-<version>/` directory (an
+`MbtiDataset`, see mbti.dataset) and then swaps the `LATEST` pointer to it. Both writes go
+through a temp path + `os.replace`, so readers always see either the previous or the new
+snapshot, never a half-written one.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from . import metrics
+from .dataset import MbtiDataset
+from .httpcache import default_cache_dir
+
+KEEP_SNAPSHOTS = 5
+POINTER = 'LATEST'
+
+
+def default_snapshot_dir():
+    return default_cache_dir() / 'snapshots'
+
+
+def _atomic_write(path, data):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.' + path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def publish(df, directory=None):
+    """Write `df` as a new snapshot, point LATEST at it and prune old ones. Returns the version.
+
+    Idempotent: if LATEST already holds the same content, nothing is written and its version
+    is returned (so a refresh that changed nothing doesn't invalidate the app's caches).
+    """
+    directory = Path(directory) if directory else default_snapshot_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    records = df.to_json(orient='records', force_ascii=False)
+    digest = hashlib.sha1(records.encode('utf-8')).hexdigest()[:12]
+    current = latest_version(directory)
+    if current and current.endswith('-' + digest) and (directory / f'countries-{current}').is_dir():
+        return current
+    version = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{digest}"
+    MbtiDataset.from_frame(df).save(directory / f'countries-{version}')
+    _atomic_write(directory / POINTER, version)
+
+    for old in sorted(directory.glob('countries-*'))[:-KEEP_SNAPSHOTS]:
+        shutil.rmtree(old, ignore_errors=True)
+    return version
+
+
+def latest_version(directory=None):
+    """Version named by the LATEST pointer, or None if nothing was published yet."""
+    directory = Path(directory) if directory else default_snapshot_dir()
+    try:
+        return (directory / POINTER).read_text(encoding='utf-8').strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load(version, directory=None, mmap=True):
+    """The `MbtiDataset` of snapshot `version` (memory-mapped by default)."""
+    directory = Path(directory) if directory else default_snapshot_dir()
+    with metrics.timer('snapshot_load'):
+        return MbtiDataset.load(directory / f'countries-{version}', mmap=mmap)
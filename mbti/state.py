@@ -0,0 +1,105 @@
+"""Per-country scrape state, used for incremental refreshes.
+
+One row per country page URL records the last good values (top type, percentage, sample size
+and the full type distribution as JSON), when the server served them, and the outcome of the
+latest attempt (a stale cached copy used while the site is down counts as a failed attempt).
+A refresh only re-fetches countries that are missing, failed last time or older than
+`max_age`; everything else keeps its stored values.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .httpcache import default_cache_dir
+
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+COLUMNS = ['country', 'iso_alpha3', 'top_type', 'percentage', 'distribution', 'sample_size', 'fetched_at']
+
+
+class CountryState:
+    def __init__(self, path=None):
+        self.path = Path(path) if path else default_cache_dir() / 'countries.sqlite'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS countries ('
+            ' url TEXT PRIMARY KEY, country TEXT, iso_alpha3 TEXT, top_type TEXT, percentage REAL,'
+            ' last_fetched REAL, last_attempt REAL, last_status INTEGER, parse_ok INTEGER, error TEXT,'
+            ' distribution TEXT, sample_size INTEGER)'
+        )
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stale_urls(self, urls, max_age=DEFAULT_MAX_AGE, now=None):
+        """Subset of `urls` that has never been scraped, failed last time, or is older than `max_age`."""
+        cutoff = (now or time.time()) - max_age
+        with self._lock:
+            good = {
+                url for (url,) in self._db.execute(
+                    'SELECT url FROM countries WHERE parse_ok = 1 AND last_status = 200 AND last_fetched >= ?',
+                    (cutoff,),
+                )
+            }
+        return [u for u in urls if u not in good]
+
+    def record_success(self, url, row, fetched_at=None):
+        """Store the values of a good page; `fetched_at` is when the server served it (default: now).
+
+        Values older than the stored ones (e.g. from a stale cached copy) don't replace them.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO countries VALUES (?, ?, ?, ?, ?, ?, ?, 200, 1, NULL, ?, ?)'
+                ' ON CONFLICT(url) DO UPDATE SET country = excluded.country, iso_alpha3 = excluded.iso_alpha3,'
+                ' top_type = excluded.top_type, percentage = excluded.percentage,'
+                ' last_fetched = excluded.last_fetched, last_attempt = excluded.last_attempt,'
+                ' last_status = 200, parse_ok = 1, error = NULL, distribution = excluded.distribution,'
+                ' sample_size = excluded.sample_size'
+                ' WHERE countries.last_fetched IS NULL OR excluded.last_fetched >= countries.last_fetched',
+                (url, row['country'], row['iso_alpha3'], row['top_type'], row['percentage'], fetched_at or now, now,
+                 json.dumps(row.get('distribution') or {}), row.get('sample_size')),
+            )
+            self._db.commit()
+
+    def record_failure(self, url, country, status, error):
+        """Note a failed attempt; previously scraped values for `url` are kept."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO countries (url, country, last_attempt, last_status, parse_ok, error)'
+                ' VALUES (?, ?, ?, ?, 0, ?)'
+                ' ON CONFLICT(url) DO UPDATE SET last_attempt = excluded.last_attempt,'
+                ' last_status = excluded.last_status, parse_ok = 0, error = excluded.error',
+                (url, country, now, status, error),
+            )
+            self._db.commit()
+
+    def frame(self):
+        """All countries with a good value (current or from an earlier refresh)."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT country, iso_alpha3, top_type, percentage, distribution, sample_size, last_fetched'
+                ' FROM countries WHERE top_type IS NOT NULL ORDER BY country'
+            ).fetchall()
+        rows = [r[:4] + (json.loads(r[4] or '{}'),) + r[5:] for r in rows]
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df['fetched_at'] = pd.to_datetime(df['fetched_at'], unit='s')
+        return df
+
+    def failures(self):
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT url, last_status, error FROM countries WHERE parse_ok = 0 ORDER BY url'
+            ).fetchall()
+        return pd.DataFrame(rows, columns=['url', 'last_status', 'error'])
@@ -0,0 +1,50 @@
+"""Expensive one-time setup, run in a background thread so the first page render doesn't wait.
+
+    warmup.start()          # once per server (main.py keeps the handle in st.cache_resource)
+
+Tasks: the country-name index over pycountry's database, and Plotly Express with its default
+template. Each task is timed as stage `warm_up_<name>`; code that needs one of them before it
+is done simply does the work itself (both are idempotent and guarded by import / index locks).
+"""
+
+import logging
+import threading
+
+from . import metrics
+from .countries import get_resolver
+from .figures import warm_up as plotly_warm_up
+
+logger = logging.getLogger(__name__)
+
+TASKS = {
+    'plotly': plotly_warm_up,
+    'resolver': lambda: get_resolver().warm_up(),
+}
+
+
+class WarmUp:
+    def __init__(self, tasks=TASKS):
+        self.tasks = dict(tasks)
+        self.done = set()
+        self._thread = threading.Thread(target=self._run, name='mbti-warm-up', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _run(self):
+        for name, task in self.tasks.items():
+            try:
+                with metrics.timer(f'warm_up_{name}'):
+                    task()
+                self.done.add(name)
+            except Exception:
+                logger.exception('Warm-up task %s failed', name)
+
+
+def start(tasks=TASKS):
+    return WarmUp(tasks).start()
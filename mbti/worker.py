@@ -0,0 +1,114 @@
+"""Background refresh worker: scrape 16Personalities on a schedule and publish snapshots.
+
+Run it as a separate process next to the Streamlit app:
+
+    python -m mbti.worker                 # refresh every 6 hours
+    python -m mbti.worker --once --force  # one full re-scrape, then exit
+
+or start it in-process with `BackgroundRefresher(...).start()`: main.py starts one per server
+the first time a session selects the scrape source, unless MBTI_EXTERNAL_WORKER is set. Either
+way the app only ever reads the latest snapshot.
+"""
+
+import argparse
+import logging
+import os
+import threading
+import time
+
+from . import metrics, snapshots
+from .scraper import BASE_URL, scrape_16personalities_world
+
+DEFAULT_INTERVAL = 6 * 3600
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_once(base=BASE_URL, snapshot_dir=None, force=False, metrics_file=None):
+    """Run one (incremental) scrape and publish it. Returns the new snapshot version.
+
+    With `metrics_file`, the Prometheus text file is rewritten afterwards (also on failure).
+    """
+    try:
+        df = scrape_16personalities_world(base, force=force)
+        version = snapshots.publish(df, snapshot_dir)
+        metrics.inc('mbti_refresh_total', outcome='ok')
+    except Exception:
+        metrics.inc('mbti_refresh_total', outcome='error')
+        raise
+    finally:
+        if metrics_file:
+            metrics.REGISTRY.write_textfile(metrics_file)
+    logger.info('Published snapshot %s (%d countries)', version, len(df))
+    return version
+
+
+class BackgroundRefresher:
+    """Daemon thread that calls `refresh_once` every `interval` seconds or on request."""
+
+    def __init__(self, interval=DEFAULT_INTERVAL, base=BASE_URL, snapshot_dir=None):
+        self.interval = interval
+        self.base = base
+        self.snapshot_dir = snapshot_dir
+        self.last_error = None
+        self.last_run = None
+        self.running = False
+        self._wake = threading.Event()
+        self._force = False
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name='mbti-refresher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop = True
+        self._wake.set()
+
+    def request_refresh(self, force=False):
+        """Run a refresh as soon as possible instead of waiting for the next interval."""
+        self._force = self._force or force
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop:
+            force, self._force = self._force, False
+            self.running = True
+            try:
+                refresh_once(self.base, self.snapshot_dir, force=force)
+                self.last_error = None
+            except Exception as e:
+                logger.exception('Background refresh failed')
+                self.last_error = e
+            self.running = False
+            self.last_run = time.time()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help='seconds between refreshes')
+    parser.add_argument('--once', action='store_true', help='refresh once and exit')
+    parser.add_argument('--force', action='store_true', help='re-scrape every country, not only stale ones')
+    parser.add_argument('--base', default=BASE_URL, help='site to scrape (e.g. a local stub)')
+    parser.add_argument('--snapshot-dir', default=None)
+    parser.add_argument('--metrics-file', default=os.environ.get('MBTI_METRICS_FILE'),
+                        help='Prometheus text file to write after each refresh (default: $MBTI_METRICS_FILE)')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    if args.once:
+        refresh_once(args.base, args.snapshot_dir, force=args.force, metrics_file=args.metrics_file)
+        return
+    while True:
+        try:
+            refresh_once(args.base, args.snapshot_dir, force=args.force, metrics_file=args.metrics_file)
+        except Exception:
+            logger.exception('Refresh failed; retrying in %.0fs', args.interval)
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,109 +3,26 @@ import pandas as pd
 import random
 import io
 
+from recipes import bulk
+from recipes.catalog import RecipeCatalog
+from recipes.schema import COSTS, RecipeError, validate_recipe
+from recipes.store import DuplicateRecipeError
+
 st.set_page_config("저녁 레시피 통합 추천기", layout="centered")
 
 # ---------------------------
-# 레시피 데이터 (자세한 계량 + 단계 + 시간)
+# 레시피 카탈로그 (SQLite 저장소 + 재료/검색 색인, 서버 프로세스당 하나를 모든 세션이 공유)
 # ---------------------------
-RECIPES = [
-    {
-        "name": "김치찌개",
-        "cuisine": "한식",
-        "time_min": 35,
-        "cost": "저렴",
-        "ingredients": [
-            ("묵은김치", "300g"),
-            ("돼지고기(목살)", "200g"),
-            ("두부", "1/2모"),
-            ("양파", "1/2개"),
-            ("대파", "1대"),
-            ("다진마늘", "1큰술"),
-            ("고춧가루", "1큰술"),
-            ("멸치육수 또는 물", "500ml"),
-            ("식용유", "1큰술"),
-            ("소금/설탕(간)", "약간")
-        ],
-        "steps": [
-            {"step": "돼지고기는 한입 크기로 썰고, 김치는 먹기 좋게 자른다.", "est_min": 5},
-            {"step": "냄비에 식용유를 두르고 돼지고기를 볶아 겉면이 익으면 다진마늘을 넣고 향을 낸다.", "est_min": 3},
-            {"step": "김치를 넣고 함께 3~4분 정도 더 볶아 김치의 신맛을 약간 날린다.", "est_min": 4},
-            {"step": "멸치육수(또는 물) 500ml를 붓고 끓인다.", "est_min": 2},
-            {"step": "중불로 줄이고 15분 정도 끓여 재료 맛을 우려낸다.", "est_min": 15},
-            {"step": "두부와 대파를 넣고 3분 정도 더 끓인 뒤 필요하면 소금/설탕으로 간을 맞춘다.", "est_min": 3}
-        ]
-    },
-    {
-        "name": "된장찌개",
-        "cuisine": "한식",
-        "time_min": 25,
-        "cost": "저렴",
-        "ingredients": [
-            ("된장", "2큰술"),
-            ("멸치(국물용)", "6마리"),
-            ("감자", "1개"),
-            ("애호박", "1/2개"),
-            ("양파", "1/2개"),
-            ("두부", "1/2모"),
-            ("대파", "1/2대"),
-            ("다진마늘", "1/2작은술"),
-            ("물", "600ml")
-        ],
-        "steps": [
-            {"step": "감자, 애호박, 양파는 한입 크기로 썬다. 두부는 깍둑썰기.", "est_min": 5},
-            {"step": "냄비에 물과 멸치를 넣고 5분간 끓여 육수를 만든 후 멸치는 건진다.", "est_min": 5},
-            {"step": "감자를 먼저 넣고 끓이다가 된장을 체에 풀어 넣는다.", "est_min": 3},
-            {"step": "애호박과 양파를 넣고 5~7분 끓인다.", "est_min": 7},
-            {"step": "두부와 대파, 다진마늘을 넣고 1~2분 더 끓여 간을 맞춘다.", "est_min": 2}
-        ]
-    },
-    {
-        "name": "스파게티 알리오 올리오",
-        "cuisine": "이탈리아식",
-        "time_min": 20,
-        "cost": "저렴",
-        "ingredients": [
-            ("스파게티면", "100g (1인분)"),
-            ("올리브오일", "4큰술"),
-            ("마늘(슬라이스)", "4쪽"),
-            ("페페론치노(말린 고추)", "약간"),
-            ("파슬리(선택)", "약간"),
-            ("소금", "면 삶을 때"),
-            ("후추", "약간")
-        ],
-        "steps": [
-            {"step": "끓는 물에 소금을 넣고 스파게티면을 포장지 표기 시간보다 1분 덜 삶는다.", "est_min": 8},
-            {"step": "팬에 올리브오일을 두르고 중약불에서 마늘을 천천히 볶아 향을 낸다.", "est_min": 3},
-            {"step": "페페론치노를 넣고 불을 끈 뒤 삶은 면과 면수 1/4컵을 팬에 넣고 재빨리 버무린다.", "est_min": 2},
-            {"step": "파슬리와 후추를 뿌려 마무리한다.", "est_min": 1}
-        ]
-    },
-    {
-        "name": "두부야채볶음(간단 비건)",
-        "cuisine": "중식",
-        "time_min": 15,
-        "cost": "저렴",
-        "ingredients": [
-            ("두부", "1모"),
-            ("양파", "1/2개"),
-            ("파프리카", "1/2개"),
-            ("간장", "1큰술"),
-            ("다진마늘", "1작은술"),
-            ("참기름", "1작은술"),
-            ("식용유", "1큰술")
-        ],
-        "steps": [
-            {"step": "두부는 물기를 제거해 깍둑썰기 후 팬에 노릇하게 굽거나 튀겨둔다.", "est_min": 6},
-            {"step": "팬에 식용유를 두르고 양파, 파프리카를 볶다가 다진마늘과 간장을 넣어 간을 한다.", "est_min": 4},
-            {"step": "구운 두부를 넣고 재빨리 섞은 뒤 참기름을 둘러 마무리한다.", "est_min": 2}
-        ]
-    }
-]
+@st.cache_resource(show_spinner=False)
+def get_catalog():
+    return RecipeCatalog()
 
-# ---------------------------
-# 헬퍼: DataFrame 생성
-# ---------------------------
-df = pd.DataFrame([{"name": r["name"], "cuisine": r["cuisine"], "time_min": r["time_min"], "cost": r["cost"]} for r in RECIPES])
+
+catalog = get_catalog()
+ingredient_index = catalog.ingredients   # 재료 → 레시피 역색인
+search_index = catalog.search            # 이름·재료·조리 단계 전문 검색 (글자 n-gram + BM25)
+# 이번 실행 동안 볼 고정된 스냅샷 (버전마다 한 번 만들어 모든 세션이 공유)
+snapshot = catalog.snapshot()
 
 # ---------------------------
 # UI: 헤더 / 사이드바 필터
@@ -114,32 +31,73 @@ st.title("🍽 저녁 메뉴 추천 + 실제 조리 레시피")
 st.write("메뉴를 선택하면 아래에 재료와 단계별 조리법(예상 시간 포함)이 나타납니다. 재료 체크 후 장보기 버튼으로 다운로드 가능.")
 
 st.sidebar.header("필터")
-cuisine_choice = st.sidebar.selectbox("요리 스타일", options=["전체"] + sorted(df["cuisine"].unique().tolist()))
+cuisine_choice = st.sidebar.selectbox("요리 스타일", options=["전체"] + catalog.cuisines(snapshot))
 max_time = st.sidebar.slider("최대 조리 시간(분)", min_value=5, max_value=60, value=40, step=5)
 cost_choice = st.sidebar.selectbox("예산", options=["전체", "저렴", "중간", "비쌈"])
+search_query = st.text_input("🔎 레시피 검색", placeholder="메뉴 이름, 재료, 조리법으로 검색 (예: 볶음밥, 두부, 데친다)")
 
 # ---------------------------
-# 필터 적용 및 메뉴 선택
+# 필터 적용 (공유 스냅샷) · 정렬 · 쪽 나누기 및 메뉴 선택
 # ---------------------------
-filtered_df = df.copy()
-if cuisine_choice != "전체":
-    filtered_df = filtered_df[filtered_df["cuisine"] == cuisine_choice]
-filtered_df = filtered_df[filtered_df["time_min"] <= max_time]
-if cost_choice != "전체":
-    filtered_df = filtered_df[filtered_df["cost"] == cost_choice]
+PAGE_SIZE = 20
+COST_ORDER = {c: i for i, c in enumerate(COSTS)}
+SORTS = ["추가된 순", "조리 시간 짧은 순", "이름순", "예산 낮은 순"]
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def result_names(version, cuisine, max_time, cost, query, sort, _snapshot):
+    # 필터·검색·정렬 결과(메뉴 이름 튜플). 같은 버전·조건이면 모든 세션과 이후 실행이 그대로 재사용한다.
+    frame = catalog.query(cuisine, max_time, cost, snapshot=_snapshot)
+    if query:
+        # 필터에 맞는 레시피 안에서 검색 (검색 상위 N 개를 자른 뒤 거르면 맞는 메뉴가 빠진다)
+        names = [name for name, _score in search_index.search(query, limit=None, allowed=frame["name"])]
+        if sort == "추가된 순":
+            frame = frame[frame["name"].isin(names)]  # 스냅샷 frame 이 추가된 순서
+        else:
+            # 관련도 순으로 두면 아래 정렬에서 값이 같은 메뉴끼리는 관련도 순서가 유지된다
+            frame = frame.set_index("name").loc[names].reset_index()
+    if sort == "조리 시간 짧은 순":
+        frame = frame.sort_values("time_min", kind="stable")
+    elif sort == "이름순":
+        frame = frame.sort_values("name", kind="stable")
+    elif sort == "예산 낮은 순":
+        frame = frame.sort_values("cost", key=lambda s: s.map(COST_ORDER), kind="stable")
+    return tuple(frame["name"])
+
+
+query = search_query.strip()
+sort_choice = st.sidebar.selectbox("정렬", options=(["검색 관련도순"] if query else []) + SORTS)
+names = result_names(
+    snapshot.version,
+    None if cuisine_choice == "전체" else cuisine_choice,
+    max_time,
+    None if cost_choice == "전체" else cost_choice,
+    query,
+    sort_choice,
+    snapshot,
+)
 
 st.subheader("추천 메뉴 목록")
-if filtered_df.empty:
+if not names:
     st.info("조건에 맞는 메뉴가 없습니다. 필터를 조정해 보세요.")
 else:
+    # 조건이 바뀌면 1쪽부터. 화면에는 한 쪽(PAGE_SIZE 개)만 그린다.
+    n_pages = -(-len(names) // PAGE_SIZE)
+    signature = (cuisine_choice, max_time, cost_choice, query, sort_choice)
+    if st.session_state.get("_list_signature") != signature:
+        st.session_state["_list_signature"] = signature
+        st.session_state["page"] = 1
+    st.session_state["page"] = min(st.session_state.get("page", 1), n_pages)
+    page = st.number_input(f"쪽 (전체 {n_pages}쪽 · {len(names)}개 메뉴)", min_value=1, max_value=n_pages, key="page")
+    menu_names = names[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+
     # 메뉴 선택 UI: 라디오 + 'Surprise me' 버튼
-    menu_names = filtered_df["name"].tolist()
     col1, col2 = st.columns([3,1])
     with col1:
         selected = st.radio("메뉴 선택", options=menu_names, index=0)
     with col2:
         if st.button("🎲 Surprise me"):
-            selected = random.choice(menu_names)
+            selected = random.choice(names)
             # set as session so below content updates
             st.session_state["_selected_temp"] = selected
 
@@ -147,19 +105,25 @@ else:
     if "_selected_temp" in st.session_state:
         selected = st.session_state.pop("_selected_temp")
 
-    # 찾은 레시피 객체
-    recipe = next((r for r in RECIPES if r["name"] == selected), None)
+    # 찾은 레시피 객체 (이름 인덱스 조회) — 상세 내용은 선택한 메뉴 하나만 불러온다
+    recipe = catalog.get(selected)
 
     # ---------------------------
     # 레시피 표시 영역
     # ---------------------------
     if recipe:
+        # 체크박스 상태는 레시피 id 로 구분한다. 다른 레시피의 남은 상태는 지워 session_state 가 쌓이지 않게 한다.
+        ing_prefix, step_prefix = f"ing_{recipe['id']}_", f"step_{recipe['id']}_"
+        for key in [k for k in st.session_state if k.startswith(("ing_", "step_"))]:
+            if not key.startswith((ing_prefix, step_prefix)):
+                del st.session_state[key]
+
         st.markdown(f"## {recipe['name']}  —  {recipe['cuisine']}  •  {recipe['time_min']}분  •  {recipe['cost']}")
         st.markdown("### 🧾 재료")
         # 재료 체크박스 (장보기용)
         ingredient_checks = []
         for idx, (ing, qty) in enumerate(recipe["ingredients"]):
-            key = f"ing_{recipe['name']}_{idx}"
+            key = f"{ing_prefix}{idx}"
             checked = st.checkbox(f"{ing} — {qty}", key=key)
             ingredient_checks.append((ing, qty, checked))
 
@@ -178,7 +142,7 @@ else:
         total_est = 0
         for i, s in enumerate(recipe["steps"], start=1):
             total_est += s.get("est_min", 0)
-            step_key = f"step_{recipe['name']}_{i}"
+            step_key = f"{step_prefix}{i}"
             cols = st.columns([8,2])
             with cols[0]:
                 st.markdown(f"**Step {i}.** {s['step']}")
@@ -186,32 +150,48 @@ else:
                 done = st.checkbox(f"{s.get('est_min',0)}분", key=step_key)
         st.markdown(f"**예상 총 조리 시간(단계 합):** {total_est} 분 (참고용)")
 
-        # 요리 시작 버튼(단계 리셋)
-        if st.button("✅ 단계 완료 표시 초기화"):
-            # 모든 step and ingredient keys related to this recipe -> reset
-            for i in range(len(recipe["ingredients"])):
-                key = f"ing_{recipe['name']}_{i}"
-                if key in st.session_state:
+        # 요리 시작 버튼(단계 리셋): 위젯이 그려지기 전에 실행되도록 콜백에서 이 레시피의 체크를 모두 푼다
+        def reset_checks(prefixes):
+            for key in list(st.session_state):
+                if key.startswith(prefixes):
                     st.session_state[key] = False
-            for i in range(len(recipe["steps"])):
-                key = f"step_{recipe['name']}_{i+1}"
-                if key in st.session_state:
-                    st.session_state[key] = False
-            st.experimental_rerun()
+
+        st.button("✅ 단계 완료 표시 초기화", on_click=reset_checks, args=((ing_prefix, step_prefix),))
 
     else:
         st.error("선택한 메뉴의 레시피를 찾을 수 없습니다.")
 
+# ---------------------------
+# 냉장고 파먹기: 가진 재료로 만들 수 있는 메뉴
+# ---------------------------
+st.markdown("---")
+st.subheader("🧊 가진 재료로 찾기")
+have = st.multiselect("가지고 있는 재료", options=ingredient_index.vocabulary(),
+                      placeholder="재료를 고르면 많이 갖춘 메뉴부터 보여줍니다")
+if have:
+    ranked = ingredient_index.rank(have, limit=20)
+    if ranked.empty:
+        st.info("고른 재료를 쓰는 메뉴가 없습니다.")
+    else:
+        st.dataframe(
+            ranked.assign(missing_items=ranked["missing_items"].map(", ".join)).rename(columns={
+                "name": "메뉴", "matched": "가진 재료", "total": "전체 재료",
+                "missing": "부족한 재료 수", "coverage": "충족률", "missing_items": "부족한 재료",
+            }),
+            hide_index=True,
+            column_config={"충족률": st.column_config.ProgressColumn("충족률", min_value=0.0, max_value=1.0, format="percent")},
+        )
+
 # ---------------------------
 # 메뉴 추가 (사용자)
 # ---------------------------
 st.markdown("---")
-with st.expander("✍️ 새 레시피 추가하기 (사용자 저장은 세션에만 저장됩니다)"):
+with st.expander("✍️ 새 레시피 추가하기 (레시피 저장소에 저장되어 모든 사용자에게 보입니다)"):
     with st.form("add_recipe_form"):
         name = st.text_input("메뉴 이름")
         cuisine_new = st.selectbox("요리 스타일", ["한식","중식","일식","이탈리아식","기타"])
         time_new = st.number_input("예상 소요 시간(분)", min_value=5, max_value=240, value=20)
-        cost_new = st.selectbox("예산", ["저렴","중간","비쌈"])
+        cost_new = st.selectbox("예산", COSTS)
         # 재료 입력: 한 줄에 '재료 — 수량' 또는 '재료,수량' 형식 권장
         ing_text = st.text_area("재료 (한 줄에 하나씩 — 예: 두부,200g)", height=120)
         steps_text = st.text_area("단계별 조리법 (한 줄에 하나의 단계와 예상 분 수를 같이 적어주세요. 예: '팬을 달군다|2')", height=160)
@@ -221,41 +201,44 @@ with st.expander("✍️ 새 레시피 추가하기 (사용자 저장은 세션
             if not name.strip() or not ing_text.strip() or not steps_text.strip():
                 st.error("모든 필드를 채워 주세요.")
             else:
-                # 파싱
-                ing_lines = [l.strip() for l in ing_text.splitlines() if l.strip()]
-                ingreds = []
-                for line in ing_lines:
-                    if "," in line:
-                        a,b = line.split(",",1)
-                        ingreds.append((a.strip(), b.strip()))
-                    elif "—" in line:
-                        a,b = line.split("—",1)
-                        ingreds.append((a.strip(), b.strip()))
-                    else:
-                        ingreds.append((line.strip(), "적당량"))
-                step_lines = [l.strip() for l in steps_text.splitlines() if l.strip()]
-                steps_parsed = []
-                for line in step_lines:
-                    if "|" in line:
-                        txt, mm = line.split("|",1)
-                        try:
-                            est = int(mm.strip())
-                        except:
-                            est = 0
-                        steps_parsed.append({"step": txt.strip(), "est_min": est})
-                    else:
-                        steps_parsed.append({"step": line, "est_min": 0})
+                # 파싱·검증 (일괄 가져오기와 같은 규칙: recipes/schema.py)
+                try:
+                    new_recipe = validate_recipe({
+                        "name": name, "cuisine": cuisine_new, "time_min": time_new, "cost": cost_new,
+                        "ingredients": ing_text, "steps": steps_text,
+                    })
+                    # 카탈로그에 추가 (저장소와 색인이 한 잠금 아래에서 함께 갱신된다)
+                    catalog.add(new_recipe)
+                except (RecipeError, DuplicateRecipeError) as e:
+                    st.error(str(e))
+                else:
+                    st.success(f"'{new_recipe['name']}' 레시피가 추가되었습니다. 페이지 상단의 메뉴에서 선택해 보세요.")
 
-                new_recipe = {
-                    "name": name.strip(),
-                    "cuisine": cuisine_new,
-                    "time_min": int(time_new),
-                    "cost": cost_new,
-                    "ingredients": ingreds,
-                    "steps": steps_parsed
-                }
-                # 세션에 추가
-                RECIPES.append(new_recipe)
-                df = pd.concat([df, pd.DataFrame([{"name": new_recipe["name"], "cuisine": new_recipe["cuisine"],
-                                                  "time_min": new_recipe["time_min"], "cost": new_recipe.get("cost","저렴")}])], ignore_index=True)
-                st.success(f"'{new_recipe['name']}' 레시피가 추가되었습니다. 페이지 상단의 메뉴에서 선택해 보세요.")
+# ---------------------------
+# 일괄 가져오기 / 내보내기
+# ---------------------------
+with st.expander("📦 레시피 일괄 가져오기 / 내보내기 (JSON Lines · CSV · Parquet)"):
+    st.caption("CSV/Parquet 열: name, cuisine, time_min, cost, ingredients, steps — "
+               "ingredients/steps 는 위 폼과 같은 형식('재료,수량', '단계|분')을 줄바꿈으로 구분합니다.")
+    uploaded = st.file_uploader("레시피 파일", type=["jsonl", "ndjson", "csv", "parquet"])
+    if uploaded is not None and st.button("가져오기"):
+        with st.spinner("가져오는 중..."):
+            try:
+                report = bulk.import_recipes(catalog, uploaded, bulk.detect_format(uploaded.name))
+            except RecipeError as e:
+                st.error(str(e))
+            else:
+                st.success(f"추가 {report.imported}건, 중복 건너뜀 {report.skipped}건, 오류 {report.failed}건")
+                if report.errors:
+                    st.dataframe(pd.DataFrame(report.errors, columns=["행", "오류"]), hide_index=True)
+
+    export_fmt = st.selectbox("내보내기 형식", ["jsonl", "csv", "parquet"])
+    if st.button("내보내기 파일 만들기"):
+        buf = io.BytesIO()
+        try:
+            bulk.export_recipes(catalog.store, buf, export_fmt)
+        except RecipeError as e:
+            st.error(str(e))
+        else:
+            st.download_button(f"다운로드 (recipes.{export_fmt})", data=buf.getvalue(),
+                               file_name=f"recipes.{export_fmt}", mime="application/octet-stream")
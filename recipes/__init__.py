@@ -0,0 +1 @@
+"""저녁 레시피 추천기(pages/00_applepie.py)의 데이터 계층."""
@@ -0,0 +1,193 @@
+"""레시피 일괄 가져오기/내보내기 (JSON Lines, CSV, Parquet).
+
+파일은 한 행씩 스트리밍으로 읽어 `schema.validate_recipe` 로 검증하고, `batch_size` 건씩 모아
+`store.add_many` 로 한 트랜잭션씩 넣는다. `store` 로 `catalog.RecipeCatalog` 를 넘기면 검색/재료
+색인도 묶음마다 함께 갱신된다. 잘못된 행은 건너뛰고 (행 번호, 사유)를 보고서에 남긴다.
+
+    python -m recipes.bulk import recipes.jsonl
+    python -m recipes.bulk export recipes.parquet
+
+CSV/Parquet 의 ingredients/steps 열은 폼과 같은 텍스트 형식(`재료,수량`, `단계|분` 을 줄바꿈으로 구분),
+JSON Lines 는 그 텍스트나 목록(`[[재료, 수량], ...]`, `[{"step": ..., "est_min": ...}, ...]`)을 쓴다.
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+from .schema import FIELDS, RecipeError, format_ingredients, format_steps, validate_recipe
+from .store import RecipeStore
+
+FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+BATCH_SIZE = 2000
+MAX_ERRORS = 100  # 보고서에 남길 오류 행 수 (세는 것은 전부)
+
+ImportReport = namedtuple("ImportReport", ["imported", "skipped", "failed", "errors"])
+
+
+def detect_format(name):
+    fmt = FORMATS.get(Path(str(name)).suffix.lower())
+    if fmt is None:
+        raise RecipeError(f"{name}: 지원하지 않는 파일 형식입니다 ({', '.join(sorted(FORMATS))})")
+    return fmt
+
+
+@contextmanager
+def _text(fileobj):
+    # 업로드 파일(바이너리)과 열린 텍스트 파일을 모두 받는다. 바이너리 파일은 닫지 않고 돌려준다.
+    if isinstance(fileobj, io.TextIOBase):
+        yield fileobj
+        return
+    wrapper = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        yield wrapper
+    finally:
+        wrapper.flush()
+        wrapper.detach()
+
+
+def iter_rows(fileobj, fmt):
+    """(행 번호, dict) 를 하나씩. 파일 전체를 메모리에 올리지 않는다."""
+    if fmt == "jsonl":
+        with _text(fileobj) as f:
+            for lineno, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield lineno, RecipeError(f"JSON 형식 오류: {e.msg}")
+                    continue
+                yield lineno, row if isinstance(row, dict) else RecipeError("JSON 객체가 아닙니다.")
+    elif fmt == "csv":
+        # 헤더가 1행이므로 데이터는 2행부터 (값 안의 줄바꿈은 따옴표로 감싼다)
+        with _text(fileobj) as f:
+            yield from enumerate(csv.DictReader(f), start=2)
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RecipeError("Parquet 을 읽으려면 pyarrow 가 필요합니다 (pip install pyarrow)") from None
+        pf = pq.ParquetFile(fileobj)
+        columns = [c for c in pf.schema_arrow.names if c in FIELDS]
+        lineno = 0
+        for batch in pf.iter_batches(batch_size=BATCH_SIZE, columns=columns):
+            for row in batch.to_pylist():
+                lineno += 1
+                yield lineno, row
+    else:
+        raise RecipeError(f"알 수 없는 형식: {fmt}")
+
+
+def import_recipes(store, fileobj, fmt, batch_size=BATCH_SIZE):
+    """`fileobj` 의 레시피를 검증해 `store`(RecipeStore 또는 RecipeCatalog)에 묶음 단위로 추가.
+    이미 있는 이름은 건너뛴다.
+    """
+    imported = skipped = failed = 0
+    errors = []
+    batch = []
+
+    def flush():
+        nonlocal imported, skipped
+        added = store.add_many(batch, skip_existing=True)
+        imported += len(added)
+        skipped += len(batch) - len(added)
+        batch.clear()
+
+    for lineno, row in iter_rows(fileobj, fmt):
+        try:
+            if isinstance(row, Exception):
+                raise row
+            batch.append(validate_recipe(row))
+        except RecipeError as e:
+            failed += 1
+            if len(errors) < MAX_ERRORS:
+                errors.append((lineno, str(e)))
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return ImportReport(imported, skipped, failed, errors)
+
+
+def export_recipes(store, fileobj, fmt):
+    """저장소 전체를 `fmt` 로 내보내고 건수를 반환. jsonl/csv 는 텍스트, parquet 은 바이너리 파일 객체."""
+    recipes = store.iter_recipes()
+    count = 0
+    if fmt == "jsonl":
+        with _text(fileobj) as out:
+            for r in recipes:
+                record = {k: r[k] for k in FIELDS}
+                record["ingredients"] = [list(pair) for pair in r["ingredients"]]
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+    elif fmt == "csv":
+        with _text(fileobj) as out:
+            writer = csv.DictWriter(out, fieldnames=FIELDS)
+            writer.writeheader()
+            for r in recipes:
+                writer.writerow(_flat(r))
+                count += 1
+    elif fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RecipeError("Parquet 으로 내보내려면 pyarrow 가 필요합니다 (pip install pyarrow)") from None
+
+        schema = pa.schema([("name", pa.string()), ("cuisine", pa.string()), ("time_min", pa.int32()),
+                            ("cost", pa.string()), ("ingredients", pa.string()), ("steps", pa.string())])
+        with pq.ParquetWriter(fileobj, schema) as writer:
+            rows = []
+            for r in recipes:
+                rows.append(_flat(r))
+                if len(rows) >= BATCH_SIZE:
+                    writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                    count += len(rows)
+                    rows = []
+            if rows:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                count += len(rows)
+    else:
+        raise RecipeError(f"알 수 없는 형식: {fmt}")
+    return count
+
+
+def _flat(r):
+    return {"name": r["name"], "cuisine": r["cuisine"], "time_min": r["time_min"], "cost": r["cost"],
+            "ingredients": format_ingredients(r["ingredients"]), "steps": format_steps(r["steps"])}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="레시피 파일 (.jsonl / .csv / .parquet)")
+    parser.add_argument("--db", default=None, help="저장소 경로 (기본: $RECIPE_DB 또는 .cache/recipes.sqlite)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = detect_format(args.path)
+    store = RecipeStore(args.db)
+    try:
+        if args.command == "import":
+            with open(args.path, "rb") as f:
+                report = import_recipes(store, f, fmt, batch_size=args.batch_size)
+            for lineno, message in report.errors:
+                print(f"{args.path}:{lineno}: {message}", file=sys.stderr)
+            print(f"추가 {report.imported}건, 중복 건너뜀 {report.skipped}건, 오류 {report.failed}건")
+        else:
+            with open(args.path, "wb") as f:
+                count = export_recipes(store, f, fmt)
+            print(f"{count}건을 {args.path} 로 내보냈습니다")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
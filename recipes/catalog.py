@@ -0,0 +1,108 @@
+"""모든 세션이 공유하는 레시피 카탈로그: 저장소 + 재료/검색 색인 + 버전이 붙은 읽기 스냅샷.
+
+- 쓰기(`add`, `add_many`)는 하나의 잠금 아래에서 저장소에 넣고, 새로 들어간 행을 저장소에서 다시
+  읽어 두 색인에 반영한 뒤 `version` 을 올린다. 다른 프로세스가 같은 DB 에 넣은 행
+  (`python -m recipes.bulk import`)도 `PRAGMA data_version` 으로 알아채 같은 방식으로 따라잡는다.
+- 읽기(`snapshot`)는 잠금 없이 현재 `Snapshot(version, frame)` 을 돌려준다. `frame` 은 요약 열
+  (name, cuisine, time_min, cost)의 DataFrame 으로, 버전마다 한 번만 만들어 모든 세션이 같이 쓴다.
+  새 버전은 이전 frame 에 추가분만 이어 붙인 새 객체(copy-on-write)라서 이미 받은 스냅샷은 바뀌지 않는다.
+"""
+
+import threading
+from collections import namedtuple
+
+import pandas as pd
+
+from .ingredients import IngredientIndex
+from .search import SearchIndex
+from .store import RecipeStore
+
+SUMMARY_COLUMNS = ["name", "cuisine", "time_min", "cost"]
+Snapshot = namedtuple("Snapshot", ["version", "frame"])
+
+
+class RecipeCatalog:
+    def __init__(self, store=None):
+        self.store = store if store is not None else RecipeStore()
+        self.ingredients = IngredientIndex()
+        self.search = SearchIndex()
+        self._write_lock = threading.Lock()
+        self._last_id = 0
+        self._data_version = self.store.data_version()
+        self._pending = []  # 아직 frame 에 붙이지 않은 요약 행
+        self._snapshot = Snapshot(0, pd.DataFrame(columns=SUMMARY_COLUMNS))
+        self._cuisines = (None, [])
+        with self._write_lock:
+            self._catch_up()
+
+    def __len__(self):
+        return len(self.ingredients)
+
+    # ---------------------------
+    # 쓰기
+    # ---------------------------
+    def add(self, recipe):
+        """한 건 추가. 이름이 겹치면 DuplicateRecipeError."""
+        with self._write_lock:
+            self.store.add(recipe)
+            self._catch_up()
+
+    def add_many(self, recipes, skip_existing=True):
+        """여러 건을 한 트랜잭션으로 추가하고 추가된 레시피 목록을 반환 (bulk.import_recipes 와 호환)."""
+        with self._write_lock:
+            added = self.store.add_many(recipes, skip_existing=skip_existing)
+            self._catch_up()
+        return added
+
+    def _catch_up(self):
+        # _write_lock 아래에서: 마지막으로 본 id 이후의 행을 색인과 대기 목록에 반영
+        fresh = list(self.store.iter_recipes(after_id=self._last_id))
+        if not fresh:
+            return
+        self.ingredients.add_many((r["name"], r["ingredients"]) for r in fresh)
+        self.search.add_many(fresh)
+        self._pending.extend((r["name"], r["cuisine"], r["time_min"], r["cost"]) for r in fresh)
+        self._last_id = fresh[-1]["id"]
+
+    # ---------------------------
+    # 읽기
+    # ---------------------------
+    def snapshot(self):
+        """현재 버전의 (version, 요약 frame). 바뀐 것이 없으면 잠금 없이 바로 돌려준다."""
+        data_version = self.store.data_version()
+        if not self._pending and data_version == self._data_version:
+            return self._snapshot
+        with self._write_lock:
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._catch_up()
+            if self._pending:
+                old = self._snapshot
+                added = pd.DataFrame(self._pending, columns=SUMMARY_COLUMNS)
+                frame = added if old.frame.empty else pd.concat([old.frame, added], ignore_index=True)
+                self._snapshot = Snapshot(old.version + 1, frame)
+                self._pending = []
+            return self._snapshot
+
+    def query(self, cuisine=None, max_time=None, cost=None, snapshot=None):
+        """요리 스타일·최대 조리 시간·예산 필터를 공유 스냅샷 위에서 (None 인 조건은 무시)."""
+        frame = (snapshot or self.snapshot()).frame
+        mask = pd.Series(True, index=frame.index)
+        if cuisine is not None:
+            mask &= frame["cuisine"] == cuisine
+        if max_time is not None:
+            mask &= frame["time_min"] <= int(max_time)
+        if cost is not None:
+            mask &= frame["cost"] == cost
+        return frame[mask]
+
+    def cuisines(self, snapshot=None):
+        snapshot = snapshot or self.snapshot()
+        cached = self._cuisines
+        if cached[0] != snapshot.version:
+            cached = self._cuisines = (snapshot.version, sorted(snapshot.frame["cuisine"].unique().tolist()))
+        return cached[1]
+
+    def get(self, name):
+        return self.store.get(name)
+
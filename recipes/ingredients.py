@@ -0,0 +1,173 @@
+"""재료 정규화 + 재료 → 레시피 역색인, "가진 재료로 요리하기" 순위 계산.
+
+레시피의 재료 한 줄(슬롯)은 정규화된 대안 이름 하나 이상으로 바뀐다:
+"돼지고기(목살)" → {돼지고기}, "멸치육수 또는 물" → {멸치, 물} (SYNONYMS 적용). 가진 재료가 대안 중 하나라도
+있으면 그 슬롯은 채워진 것으로 본다.
+
+색인은 CSR 형태의 NumPy 배열(대안 → 슬롯 → 레시피)로 들고 있어서, 가진 재료 집합이 주어지면
+모든 레시피의 충족 슬롯 수 / 부족한 재료 수를 `np.bincount` 두 번으로 한꺼번에 계산한다.
+레시피를 하나씩 도는 파이썬 루프가 없으므로 수만 건에서도 수십 ms 안에 끝난다.
+"""
+
+import re
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+_PARENS = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_ALTERNATIVES = re.compile(r"\s+또는\s+|\s+or\s+|/|,")
+_SPACE = re.compile(r"\s+")
+
+# 같은 재료로 취급할 이름
+SYNONYMS = {
+    "다진마늘": "마늘",
+    "묵은김치": "김치",
+    "스파게티면": "스파게티",
+    "멸치육수": "멸치",
+    "국물용멸치": "멸치",
+}
+
+
+@lru_cache(maxsize=65536)
+def normalize_ingredient(name):
+    """재료 이름 → 정규화된 대안 이름 튜플. 예: '소금/설탕(간)' → ('소금', '설탕')."""
+    text = _PARENS.sub(" ", str(name)).lower()
+    alternatives = []
+    for part in _ALTERNATIVES.split(text):
+        key = _SPACE.sub("", part)
+        key = SYNONYMS.get(key, key)
+        if key and key not in alternatives:
+            alternatives.append(key)
+    return tuple(alternatives)
+
+
+class IngredientIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.vocab = {}            # 정규화 이름 → id
+        self.names = []            # id → 정규화 이름
+        self.recipes = []          # 행 번호 → 레시피 이름
+        self._row = {}             # 레시피 이름 → 행 번호
+        self.postings = []         # 재료 id → 그 재료를 쓰는 레시피 행 번호 목록 (역색인)
+        # CSR: 대안(alt) → 슬롯 → 레시피
+        self._alt_vocab = []       # 대안마다 재료 id
+        self._alt_slot = []        # 대안마다 슬롯 번호
+        self._slot_recipe = []     # 슬롯마다 레시피 행 번호
+        self._slot_label = []      # 슬롯마다 원래 재료 이름 (부족한 재료 표시용)
+        self._arrays = None        # 위 목록들의 NumPy 버전; 추가가 있으면 다음 조회 때 다시 만든다
+        self._vocabulary = None    # (레시피 수, vocabulary() 결과)
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def _term_id(self, term):
+        tid = self.vocab.get(term)
+        if tid is None:
+            tid = self.vocab[term] = len(self.names)
+            self.names.append(term)
+            self.postings.append([])
+        return tid
+
+    def add(self, name, ingredients):
+        """레시피 하나의 (재료, 수량) 목록을 색인에 추가."""
+        self.add_many([(name, ingredients)])
+
+    def add_many(self, items):
+        """(레시피 이름, 재료 목록) 여러 개를 한 번에 추가 (배열 재구성은 다음 조회 때 한 번)."""
+        with self._lock:
+            for name, ingredients in items:
+                if name in self._row:
+                    continue
+                row = self._row[name] = len(self.recipes)
+                self.recipes.append(name)
+                for ing, _qty in ingredients:
+                    alternatives = normalize_ingredient(ing)
+                    if not alternatives:
+                        continue
+                    slot = len(self._slot_recipe)
+                    self._slot_recipe.append(row)
+                    self._slot_label.append(ing)
+                    for term in alternatives:
+                        tid = self._term_id(term)
+                        self._alt_vocab.append(tid)
+                        self._alt_slot.append(slot)
+                        postings = self.postings[tid]
+                        if not postings or postings[-1] != row:
+                            postings.append(row)
+            self._arrays = None
+
+    def _compiled(self):
+        arrays = self._arrays
+        if arrays is None:
+            with self._lock:
+                slot_recipe = np.asarray(self._slot_recipe, dtype=np.int32)
+                arrays = self._arrays = {
+                    "alt_vocab": np.asarray(self._alt_vocab, dtype=np.int32),
+                    "alt_slot": np.asarray(self._alt_slot, dtype=np.int32),
+                    "slot_recipe": slot_recipe,
+                    "total": np.bincount(slot_recipe, minlength=len(self.recipes)).astype(np.int32),
+                    "n_vocab": len(self.names),
+                    "n_recipes": len(self.recipes),
+                }
+        return arrays
+
+    def vocabulary(self):
+        """재료 이름들, 많이 쓰이는 순 (레시피가 추가될 때까지 같은 목록을 재사용)."""
+        with self._lock:
+            cached = self._vocabulary
+            if cached is None or cached[0] != len(self.recipes):
+                order = sorted(range(len(self.names)), key=lambda i: (-len(self.postings[i]), self.names[i]))
+                cached = self._vocabulary = (len(self.recipes), [self.names[i] for i in order])
+            return cached[1]
+
+    def recipes_with(self, ingredient):
+        """역색인: 이 재료를 쓰는 레시피 이름 목록."""
+        ids = [self.vocab[t] for t in normalize_ingredient(ingredient) if t in self.vocab]
+        rows = sorted({r for tid in ids for r in self.postings[tid]})
+        return [self.recipes[r] for r in rows]
+
+    def rank(self, have, limit=20, min_matched=1):
+        """가진 재료로 만들 수 있는 정도로 레시피 순위를 매긴다.
+
+        반환: name, matched, total, missing, coverage, missing_items 열의 DataFrame
+        (coverage 내림차순, 부족한 재료 수 오름차순). missing_items 는 상위 `limit` 개에만 채운다.
+        """
+        a = self._compiled()
+        columns = ["name", "matched", "total", "missing", "coverage", "missing_items"]
+        if a["n_recipes"] == 0:
+            return pd.DataFrame(columns=columns)
+
+        have_mask = np.zeros(a["n_vocab"], dtype=bool)
+        for ing in have:
+            for term in normalize_ingredient(ing):
+                tid = self.vocab.get(term)
+                if tid is not None and tid < a["n_vocab"]:
+                    have_mask[tid] = True
+
+        # 대안 하나라도 있으면 슬롯 충족 → 레시피별 충족 슬롯 수
+        n_slots = len(a["slot_recipe"])
+        slot_ok = np.bincount(a["alt_slot"], weights=have_mask[a["alt_vocab"]], minlength=n_slots) > 0
+        matched = np.bincount(a["slot_recipe"], weights=slot_ok, minlength=a["n_recipes"]).astype(np.int32)
+        total = a["total"]
+        missing = total - matched
+        with np.errstate(invalid="ignore", divide="ignore"):
+            coverage = np.where(total > 0, matched / np.maximum(total, 1), 0.0)
+
+        candidates = np.flatnonzero(matched >= min_matched)
+        order = candidates[np.lexsort((missing[candidates], -coverage[candidates]))][:limit]
+
+        # 슬롯은 레시피 순서대로 붙어 있으므로 각 레시피의 슬롯 구간은 searchsorted 로 찾는다
+        starts = np.searchsorted(a["slot_recipe"], order, side="left")
+        ends = np.searchsorted(a["slot_recipe"], order, side="right")
+        missing_items = [[self._slot_label[s] for s in range(lo, hi) if not slot_ok[s]]
+                         for lo, hi in zip(starts.tolist(), ends.tolist())]
+        return pd.DataFrame({
+            "name": [self.recipes[r] for r in order.tolist()],
+            "matched": matched[order],
+            "total": total[order],
+            "missing": missing[order],
+            "coverage": coverage[order],
+            "missing_items": missing_items,
+        }, columns=columns)
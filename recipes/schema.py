@@ -0,0 +1,121 @@
+"""레시피 입력 형식과 검증 — 추가 폼과 일괄 가져오기가 같은 규칙을 쓴다.
+
+- 재료: 한 줄에 하나, `재료,수량` 또는 `재료 — 수량`. 수량이 없으면 "적당량".
+- 단계: 한 줄에 하나, `설명|분`. 분이 숫자가 아니거나 없으면 0.
+"""
+
+COSTS = ["저렴", "중간", "비쌈"]
+FIELDS = ["name", "cuisine", "time_min", "cost", "ingredients", "steps"]
+MIN_TIME, MAX_TIME = 5, 240
+
+
+class RecipeError(ValueError):
+    """레시피 입력이 형식에 맞지 않음."""
+
+
+def parse_ingredients(text):
+    """'재료,수량' 줄들 → [(재료, 수량), ...]."""
+    ingreds = []
+    for line in str(text).splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if "," in line:
+            a, b = line.split(",", 1)
+            ingreds.append((a.strip(), b.strip()))
+        elif "—" in line:
+            a, b = line.split("—", 1)
+            ingreds.append((a.strip(), b.strip()))
+        else:
+            ingreds.append((line, "적당량"))
+    return ingreds
+
+
+def parse_steps(text):
+    """'설명|분' 줄들 → [{"step": 설명, "est_min": 분}, ...]."""
+    steps = []
+    for line in str(text).splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if "|" in line:
+            txt, mm = line.split("|", 1)
+            try:
+                est = int(mm.strip())
+            except ValueError:
+                est = 0
+            steps.append({"step": txt.strip(), "est_min": est})
+        else:
+            steps.append({"step": line, "est_min": 0})
+    return steps
+
+
+def format_ingredients(ingredients):
+    return "\n".join(f"{ing},{qty}" for ing, qty in ingredients)
+
+
+def format_steps(steps):
+    return "\n".join(f"{s['step']}|{s.get('est_min', 0)}" for s in steps)
+
+
+def _ingredients(value):
+    if isinstance(value, str):
+        return parse_ingredients(value)
+    out = []
+    for item in value or []:
+        if isinstance(item, str):
+            out.extend(parse_ingredients(item))
+        else:
+            ing, qty = item
+            out.append((str(ing).strip(), str(qty).strip() or "적당량"))
+    return out
+
+
+def _steps(value):
+    if isinstance(value, str):
+        return parse_steps(value)
+    out = []
+    for item in value or []:
+        if isinstance(item, str):
+            out.extend(parse_steps(item))
+        else:
+            try:
+                est = int(item.get("est_min") or 0)
+            except (TypeError, ValueError):
+                est = 0
+            out.append({"step": str(item["step"]).strip(), "est_min": est})
+    return out
+
+
+def validate_recipe(raw):
+    """dict(폼 입력, JSON 한 줄, CSV 한 행 …) → 저장소에 넣을 레시피 dict. 틀리면 RecipeError.
+
+    재료/단계는 위 텍스트 형식이나 이미 나뉜 목록(`[[재료, 수량], ...]`, `[{"step", "est_min"}, ...]`)
+    둘 다 받는다.
+    """
+    name = str(raw.get("name") or "").strip()
+    cuisine = str(raw.get("cuisine") or "").strip()
+    if not name:
+        raise RecipeError("메뉴 이름이 비어 있습니다.")
+    if not cuisine:
+        raise RecipeError(f"{name}: 요리 스타일이 비어 있습니다.")
+    try:
+        time_min = int(float(raw.get("time_min")))
+    except (TypeError, ValueError):
+        raise RecipeError(f"{name}: 조리 시간이 숫자가 아닙니다: {raw.get('time_min')!r}") from None
+    if not MIN_TIME <= time_min <= MAX_TIME:
+        raise RecipeError(f"{name}: 조리 시간은 {MIN_TIME}~{MAX_TIME}분이어야 합니다: {time_min}")
+    cost = str(raw.get("cost") or "저렴").strip()
+    if cost not in COSTS:
+        raise RecipeError(f"{name}: 예산은 {', '.join(COSTS)} 중 하나여야 합니다: {cost!r}")
+    try:
+        ingredients = _ingredients(raw.get("ingredients"))
+        steps = _steps(raw.get("steps"))
+    except (TypeError, ValueError, KeyError, AttributeError):
+        raise RecipeError(f"{name}: 재료/단계 형식이 잘못되었습니다.") from None
+    if not ingredients or not all(ing for ing, _qty in ingredients):
+        raise RecipeError(f"{name}: 재료가 없습니다.")
+    if not steps or not all(s["step"] for s in steps):
+        raise RecipeError(f"{name}: 조리 단계가 없습니다.")
+    return {"name": name, "cuisine": cuisine, "time_min": time_min, "cost": cost,
+            "ingredients": ingredients, "steps": steps}
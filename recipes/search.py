@@ -0,0 +1,151 @@
+"""레시피 전문 검색: 글자 n-gram 역색인 + BM25 순위.
+
+한국어는 띄어쓰기·조사 때문에 단어 단위로 자르면 "김치볶음밥" 으로 "볶음밥" 을 찾지 못한다.
+그래서 낱말마다 글자 2-gram("김치", "치볶", "볶음", "음밥")을 색인하고(메뉴 이름은 "밥", "국"
+같은 한 글자 검색을 위해 1-gram 도), 검색어도 같은 방식으로 잘라 맞춘다. 필드마다
+가중치(이름 > 재료 > 조리 단계)를 두고 BM25 로 점수를 매긴다.
+
+- 색인은 추가만 된다(`add`/`add_many`). 게시 목록(posting)은 `array` 로 들고 있어 조회 때
+  `np.frombuffer` 로 복사 없이 NumPy 배열이 되고, 점수는 검색어 n-gram 수만큼의 벡터 연산이다.
+- 같은 검색어는 LRU 캐시에서 바로 돌려준다. 레시피가 추가되면 캐시를 비운다.
+- `allowed` 로 후보 레시피를 미리 좁히면(사이드바 필터) 그 안에서 상위 `limit` 개를 고른다.
+"""
+
+import math
+import operator
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+# 필드 가중치: 이름에 나온 말이 재료·단계에 나온 말보다 중요하다
+FIELD_WEIGHTS = {"name": 3.0, "ingredients": 2.0, "steps": 1.0}
+K1 = 1.2
+B = 0.75
+CACHE_SIZE = 256
+
+
+def ngrams(text, unigrams=False):
+    """낱말별 글자 2-gram 목록. 예: '볶음밥' → ['볶음', '음밥'] (unigrams=True 면 '볶', '음', '밥' 도).
+
+    한 글자 낱말은 그 글자 자체가 된다.
+    """
+    grams = []
+    for word in _WORD.findall(unicodedata.normalize("NFC", str(text)).lower()):
+        if unigrams or len(word) == 1:
+            grams.extend(word)
+        grams.extend(map(operator.add, word, word[1:]))
+    return grams
+
+
+def query_grams(text):
+    """검색어 → 맞출 n-gram (중복 제거). 두 글자 이상인 낱말은 2-gram 만, 한 글자 낱말은 그 글자."""
+    return list(dict.fromkeys(ngrams(text)))
+
+
+def recipe_fields(recipe):
+    """검색 대상 텍스트: 이름, 재료 이름, 단계 설명."""
+    return {
+        "name": recipe["name"],
+        "ingredients": " ".join(ing for ing, _qty in recipe["ingredients"]),
+        "steps": " ".join(s["step"] for s in recipe["steps"]),
+    }
+
+
+class SearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.names = []            # 문서 번호 → 레시피 이름
+        self._doc = {}             # 레시피 이름 → 문서 번호
+        self._doc_len = array("f")  # 문서마다 가중 n-gram 수
+        self._total_len = 0.0
+        self._postings = {}        # n-gram → (문서 번호 array('i'), 가중 빈도 array('f'))
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, recipe):
+        self.add_many([recipe])
+
+    def add_many(self, recipes):
+        """레시피(dict) 여러 개를 색인에 추가. 이미 있는 이름은 건너뛴다."""
+        with self._lock:
+            for recipe in recipes:
+                name = recipe["name"]
+                if name in self._doc:
+                    continue
+                doc = self._doc[name] = len(self.names)
+                self.names.append(name)
+                tf = {}
+                for field, text in recipe_fields(recipe).items():
+                    weight = FIELD_WEIGHTS[field]
+                    for gram, count in Counter(ngrams(text, unigrams=field == "name")).items():
+                        tf[gram] = tf.get(gram, 0.0) + weight * count
+                length = sum(tf.values())
+                self._doc_len.append(length)
+                self._total_len += length
+                for gram, freq in tf.items():
+                    postings = self._postings.get(gram)
+                    if postings is None:
+                        postings = self._postings[gram] = (array("i"), array("f"))
+                    postings[0].append(doc)
+                    postings[1].append(freq)
+            self._cache.clear()
+
+    def search(self, query, limit=50, allowed=None):
+        """BM25 점수 순으로 (레시피 이름, 점수) 목록. 검색어 n-gram 의 절반 이상이 맞는 문서만.
+
+        `limit=None` 이면 전부. `allowed`(레시피 이름들)를 주면 그 레시피 중에서만 고른다 (캐시하지 않음).
+        """
+        grams = query_grams(query)
+        if not grams:
+            return []
+        if allowed is not None:
+            with self._lock:
+                return self._search(grams, limit, allowed)
+        key = (tuple(grams), limit)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                return hit
+            result = self._search(grams, limit)
+            self._cache[key] = result
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def _search(self, grams, limit, allowed=None):
+        n_docs = len(self.names)
+        if n_docs == 0:
+            return []
+        doc_len = np.frombuffer(self._doc_len, dtype=np.float32)
+        norm = K1 * (1 - B + B * doc_len / (self._total_len / n_docs))
+        scores = np.zeros(n_docs, dtype=np.float32)
+        hits = np.zeros(n_docs, dtype=np.int16)
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                continue
+            docs = np.frombuffer(postings[0], dtype=np.int32)
+            freq = np.frombuffer(postings[1], dtype=np.float32)
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * freq * (K1 + 1) / (freq + norm[docs])
+            hits[docs] += 1
+        matched = hits >= math.ceil(len(grams) / 2)
+        if allowed is not None:
+            # 필터를 먼저 적용해야 상위 limit 개 안에 걸러질 문서가 자리를 차지하지 않는다
+            keep = np.zeros(n_docs, dtype=bool)
+            keep[[self._doc[name] for name in allowed if name in self._doc]] = True
+            matched &= keep
+        candidates = np.flatnonzero(matched)
+        if limit is not None and len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(self.names[d], float(scores[d])) for d in order.tolist()]
@@ -0,0 +1,95 @@
+"""기본 레시피 데이터 (자세한 계량 + 단계 + 시간). 저장소가 비어 있을 때 한 번 넣는다."""
+
+RECIPES = [
+    {
+        "name": "김치찌개",
+        "cuisine": "한식",
+        "time_min": 35,
+        "cost": "저렴",
+        "ingredients": [
+            ("묵은김치", "300g"),
+            ("돼지고기(목살)", "200g"),
+            ("두부", "1/2모"),
+            ("양파", "1/2개"),
+            ("대파", "1대"),
+            ("다진마늘", "1큰술"),
+            ("고춧가루", "1큰술"),
+            ("멸치육수 또는 물", "500ml"),
+            ("식용유", "1큰술"),
+            ("소금/설탕(간)", "약간")
+        ],
+        "steps": [
+            {"step": "돼지고기는 한입 크기로 썰고, 김치는 먹기 좋게 자른다.", "est_min": 5},
+            {"step": "냄비에 식용유를 두르고 돼지고기를 볶아 겉면이 익으면 다진마늘을 넣고 향을 낸다.", "est_min": 3},
+            {"step": "김치를 넣고 함께 3~4분 정도 더 볶아 김치의 신맛을 약간 날린다.", "est_min": 4},
+            {"step": "멸치육수(또는 물) 500ml를 붓고 끓인다.", "est_min": 2},
+            {"step": "중불로 줄이고 15분 정도 끓여 재료 맛을 우려낸다.", "est_min": 15},
+            {"step": "두부와 대파를 넣고 3분 정도 더 끓인 뒤 필요하면 소금/설탕으로 간을 맞춘다.", "est_min": 3}
+        ]
+    },
+    {
+        "name": "된장찌개",
+        "cuisine": "한식",
+        "time_min": 25,
+        "cost": "저렴",
+        "ingredients": [
+            ("된장", "2큰술"),
+            ("멸치(국물용)", "6마리"),
+            ("감자", "1개"),
+            ("애호박", "1/2개"),
+            ("양파", "1/2개"),
+            ("두부", "1/2모"),
+            ("대파", "1/2대"),
+            ("다진마늘", "1/2작은술"),
+            ("물", "600ml")
+        ],
+        "steps": [
+            {"step": "감자, 애호박, 양파는 한입 크기로 썬다. 두부는 깍둑썰기.", "est_min": 5},
+            {"step": "냄비에 물과 멸치를 넣고 5분간 끓여 육수를 만든 후 멸치는 건진다.", "est_min": 5},
+            {"step": "감자를 먼저 넣고 끓이다가 된장을 체에 풀어 넣는다.", "est_min": 3},
+            {"step": "애호박과 양파를 넣고 5~7분 끓인다.", "est_min": 7},
+            {"step": "두부와 대파, 다진마늘을 넣고 1~2분 더 끓여 간을 맞춘다.", "est_min": 2}
+        ]
+    },
+    {
+        "name": "스파게티 알리오 올리오",
+        "cuisine": "이탈리아식",
+        "time_min": 20,
+        "cost": "저렴",
+        "ingredients": [
+            ("스파게티면", "100g (1인분)"),
+            ("올리브오일", "4큰술"),
+            ("마늘(슬라이스)", "4쪽"),
+            ("페페론치노(말린 고추)", "약간"),
+            ("파슬리(선택)", "약간"),
+            ("소금", "면 삶을 때"),
+            ("후추", "약간")
+        ],
+        "steps": [
+            {"step": "끓는 물에 소금을 넣고 스파게티면을 포장지 표기 시간보다 1분 덜 삶는다.", "est_min": 8},
+            {"step": "팬에 올리브오일을 두르고 중약불에서 마늘을 천천히 볶아 향을 낸다.", "est_min": 3},
+            {"step": "페페론치노를 넣고 불을 끈 뒤 삶은 면과 면수 1/4컵을 팬에 넣고 재빨리 버무린다.", "est_min": 2},
+            {"step": "파슬리와 후추를 뿌려 마무리한다.", "est_min": 1}
+        ]
+    },
+    {
+        "name": "두부야채볶음(간단 비건)",
+        "cuisine": "중식",
+        "time_min": 15,
+        "cost": "저렴",
+        "ingredients": [
+            ("두부", "1모"),
+            ("양파", "1/2개"),
+            ("파프리카", "1/2개"),
+            ("간장", "1큰술"),
+            ("다진마늘", "1작은술"),
+            ("참기름", "1작은술"),
+            ("식용유", "1큰술")
+        ],
+        "steps": [
+            {"step": "두부는 물기를 제거해 깍둑썰기 후 팬에 노릇하게 굽거나 튀겨둔다.", "est_min": 6},
+            {"step": "팬에 식용유를 두르고 양파, 파프리카를 볶다가 다진마늘과 간장을 넣어 간을 한다.", "est_min": 4},
+            {"step": "구운 두부를 넣고 재빨리 섞은 뒤 참기름을 둘러 마무리한다.", "est_min": 2}
+        ]
+    }
+]
@@ -0,0 +1,167 @@
+"""SQLite 레시피 저장소.
+
+- 레시피 한 건 = 한 행. 재료/단계는 JSON 문자열로 저장한다.
+- `name` 은 UNIQUE(이름 조회). 사이드바 필터는 저장소가 아니라 `catalog.RecipeCatalog` 가
+  메모리에 들고 있는 요약 frame 위에서 돌기 때문에 보조 인덱스는 두지 않는다(쓰기 비용만 든다).
+- 저장소가 비어 있으면 `seed.RECIPES` 를 넣어 둔다.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from .seed import RECIPES
+
+PAGE_ROWS = 5000
+
+
+def default_db_path():
+    """`$RECIPE_DB`, 없으면 앱 옆의 `.cache/recipes.sqlite`."""
+    path = os.environ.get("RECIPE_DB")
+    return Path(path) if path else Path(__file__).resolve().parent.parent / ".cache" / "recipes.sqlite"
+
+
+class DuplicateRecipeError(ValueError):
+    """같은 이름의 레시피가 이미 있음."""
+
+
+def _row_to_recipe(row):
+    rid, name, cuisine, time_min, cost, ingredients, steps = row
+    return {
+        "id": rid,
+        "name": name,
+        "cuisine": cuisine,
+        "time_min": time_min,
+        "cost": cost,
+        "ingredients": [tuple(pair) for pair in json.loads(ingredients)],
+        "steps": json.loads(steps),
+    }
+
+
+class RecipeStore:
+    def __init__(self, path=None, seed=True):
+        self.path = str(path) if path else str(default_db_path())
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Streamlit 세션(스레드)들이 공유한다 — 모든 접근은 self._lock 아래에서
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS recipes (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                cuisine TEXT NOT NULL,
+                time_min INTEGER NOT NULL,
+                cost TEXT NOT NULL,
+                ingredients TEXT NOT NULL,
+                steps TEXT NOT NULL
+            );
+            """
+        )
+        self._db.commit()
+        if seed and self.count() == 0:
+            self.add_many(RECIPES)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # ---------------------------
+    # 쓰기
+    # ---------------------------
+    @staticmethod
+    def _params(recipe):
+        return (
+            recipe["name"],
+            recipe["cuisine"],
+            int(recipe["time_min"]),
+            recipe.get("cost", "저렴"),
+            json.dumps([list(pair) for pair in recipe["ingredients"]], ensure_ascii=False),
+            json.dumps(recipe["steps"], ensure_ascii=False),
+        )
+
+    def add(self, recipe):
+        """레시피 한 건 추가 후 id 반환. 이름이 겹치면 DuplicateRecipeError."""
+        with self._lock:
+            try:
+                cur = self._db.execute(
+                    "INSERT INTO recipes (name, cuisine, time_min, cost, ingredients, steps) VALUES (?, ?, ?, ?, ?, ?)",
+                    self._params(recipe),
+                )
+            except sqlite3.IntegrityError:
+                raise DuplicateRecipeError(f"이미 같은 이름의 레시피가 있습니다: {recipe['name']}") from None
+            self._db.commit()
+            return cur.lastrowid
+
+    def add_many(self, recipes, skip_existing=False):
+        """여러 건을 한 트랜잭션으로 추가하고 실제로 추가된 레시피 목록을 반환.
+
+        이름이 겹치면 전체를 되돌리고 DuplicateRecipeError. `skip_existing=True` 면 이미 있는
+        이름(같은 묶음 안의 중복 포함)은 건너뛴다.
+        """
+        recipes = list(recipes)
+        with self._lock:
+            if skip_existing:
+                seen = set()
+                names = [r["name"] for r in recipes]
+                for i in range(0, len(names), 500):  # SQLite 변수 개수 제한
+                    chunk = names[i:i + 500]
+                    seen.update(n for (n,) in self._db.execute(
+                        f"SELECT name FROM recipes WHERE name IN ({','.join('?' * len(chunk))})", chunk))
+                fresh = []
+                for r in recipes:
+                    if r["name"] not in seen:
+                        seen.add(r["name"])
+                        fresh.append(r)
+                recipes = fresh
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT INTO recipes (name, cuisine, time_min, cost, ingredients, steps) VALUES (?, ?, ?, ?, ?, ?)",
+                        (self._params(r) for r in recipes),
+                    )
+            except sqlite3.IntegrityError as e:
+                raise DuplicateRecipeError(f"이미 같은 이름의 레시피가 있습니다 ({e})") from None
+        return recipes
+
+    # ---------------------------
+    # 읽기
+    # ---------------------------
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+
+    def get(self, name):
+        """이름(UNIQUE 인덱스)으로 레시피 하나를 찾는다. 없으면 None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, name, cuisine, time_min, cost, ingredients, steps FROM recipes WHERE name = ?", (name,)
+            ).fetchone()
+        return _row_to_recipe(row) if row else None
+
+    def data_version(self):
+        """다른 연결(다른 프로세스의 CLI 가져오기 등)이 커밋할 때마다 바뀌는 값."""
+        with self._lock:
+            return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def _iter_rows(self, columns, after_id=0, page=PAGE_ROWS):
+        # id 순서로 page 건씩 끊어 읽는다: 전체를 메모리에 올리지 않고, 잠금도 한 페이지 동안만 잡는다
+        last = after_id
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT id, {columns} FROM recipes WHERE id > ? ORDER BY id LIMIT ?", (last, page)
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last = rows[-1][0]
+
+    def iter_recipes(self, after_id=0):
+        """id 가 `after_id` 보다 큰 레시피(dict)를 id 순서로 (색인 구축, 내보내기용)."""
+        for row in self._iter_rows("name, cuisine, time_min, cost, ingredients, steps", after_id):
+            yield _row_to_recipe(row)